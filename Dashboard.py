@@ -2,53 +2,31 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
-import plotly.express as px
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
 import numpy as np
 
-# ------------------- PREDICTION FUNCTION -------------------
-def predict(df):
-    y = df['Final_Score']
-    features = [
-        'Midterm_Score', 'Assignments_Avg', 'Quizzes_Avg',
-        'Project_Score', 'Attendance', 'Study_Hours_per_Week', 'Sleep_Hours'
-    ]
-    X = df[features]
+from utils.aggregates import get_roster_aggregates
+from utils.scoring import make_scorer
+from utils.telemetry import finish_rerun, span, start_rerun
+from utils.training_worker import get_training_worker
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
+start_rerun("Dashboard")
 
-    r2 = r2_score(y_test, y_pred)
-    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-
-    test_students = df.loc[y_test.index].copy()
-    test_students['Predicted_Final_Score'] = y_pred
-    test_students = test_students.round(2)
-
-    cols_to_show = [
-        'Student_ID', 'First_Name', 'Gender', 'Department', 'Midterm_Score', 'Assignments_Avg',
-        'Quizzes_Avg', 'Project_Score', 'Attendance',
-        'Study_Hours_per_Week', 'Sleep_Hours', 'Predicted_Final_Score'
-    ]
+# ------------------- INITIALIZE SESSION + DATA -------------------
+# Training runs in the background; starting it here lets the model (and sklearn) load
+# while the login screen is shown, which does not wait for it
+worker = get_training_worker()
 
-    results_df = pd.DataFrame({
-        'Actual Final Score': y_test,
-        'Predicted Final Score': y_pred
-    })
 
-    return r2, rmse, results_df, test_students, cols_to_show, model
+def load_bundle():
+    """Wait for the served model and pick up a newer one whenever it is swapped in."""
+    bundle = worker.current()
+    if st.session_state.get("model_version") != bundle["version"]:
+        st.session_state.file = bundle["roster"]
+        st.session_state.model = bundle.get("router", bundle["result"][-1])
+        st.session_state.full_df = bundle["dataset"]
+        st.session_state.model_version = bundle["version"]
+    return bundle
 
-# ------------------- INITIALIZE SESSION + DATA -------------------
-if "model" not in st.session_state:
-    raw_data = pd.read_csv("Student Performance Sample.csv")
-    r2, rmse, results_df, test_students, cols_to_show, model = predict(raw_data)
-    st.session_state.file = test_students[cols_to_show]
-    st.session_state.model = model
-    st.session_state.full_df = raw_data
 
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -68,8 +46,6 @@ if not st.session_state.logged_in:
     if role:
         st.session_state.user_role = role
 
-    df = st.session_state.file
-
     if role == "Student":
         name = st.text_input("Enter your Name")
         email = st.text_input("Enter your Email ID")
@@ -82,8 +58,9 @@ if not st.session_state.logged_in:
         sleep_hrs_week = st.number_input("Enter your Sleep Hours", min_value=0.0)
 
         if st.button("Login"):
-            model = st.session_state.model
-            input_df = pd.DataFrame([{
+            load_bundle()
+            scorer = make_scorer(st.session_state.model)
+            predicted_score = scorer({
                 'Midterm_Score': mid_term_score,
                 'Assignments_Avg': assignment_avg_score,
                 'Quizzes_Avg': quiz_avg_score,
@@ -91,8 +68,7 @@ if not st.session_state.logged_in:
                 'Attendance': attendance,
                 'Study_Hours_per_Week': study_hrs_week,
                 'Sleep_Hours': sleep_hrs_week
-            }])
-            predicted_score = model.predict(input_df)[0]
+            })
 
             new_row = {
                 'Student_ID': f"ST{np.random.randint(1000, 9999)}",
@@ -124,11 +100,15 @@ if not st.session_state.logged_in:
             else:
                 st.warning("Please enter your email.")
 
+    finish_rerun()
     st.stop()
 
+bundle = load_bundle()
+
 # ------------------- STUDENT DASHBOARD -------------------
 if st.session_state.logged_in and st.session_state.user_role == "Student":
     st.set_page_config(page_title="Student Dashboard", layout="wide", initial_sidebar_state="expanded")
+    import plotly.express as px
 
     student_row = st.session_state.student_row
     st.markdown(f"## 👋 Hello {student_row['First_Name']}")
@@ -201,17 +181,19 @@ if st.session_state.logged_in and st.session_state.user_role == "Student":
             'Category': ['Study Hours per Week', 'Sleep Hours'],
             'Hours': [student_row['Study_Hours_per_Week'], student_row['Sleep_Hours']]
         })
-        fig = px.bar(hours_df, x='Category', y='Hours', text='Hours', height=400,
-                     title=f"Study vs Sleep Hours for {student_row['Student_ID']}")
-        fig.update_traces(textposition='inside')
-        fig.update_layout(yaxis_title='Hours', xaxis_title='Category', showlegend=False)
+        with span("chart.plotly"):
+            fig = px.bar(hours_df, x='Category', y='Hours', text='Hours', height=400,
+                         title=f"Study vs Sleep Hours for {student_row['Student_ID']}")
+            fig.update_traces(textposition='inside')
+            fig.update_layout(yaxis_title='Hours', xaxis_title='Category', showlegend=False)
         st.plotly_chart(fig)
 
     with col5:
         st.subheader("Grade Overview")
         gpa = (student_row['Final_Score'] / 100) * 10
-        gauge = go.Figure(go.Indicator(mode="gauge+number", value=gpa, title={'text': "Your Grade"},
-                                       gauge={'axis': {'range': [0, 10]}}))
+        with span("chart.plotly"):
+            gauge = go.Figure(go.Indicator(mode="gauge+number", value=gpa, title={'text': "Your Grade"},
+                                           gauge={'axis': {'range': [0, 10]}}))
         st.plotly_chart(gauge)
 
     with col6:
@@ -223,7 +205,7 @@ if st.session_state.logged_in and st.session_state.user_role == "Student":
 # ------------------- TEACHER DASHBOARD -------------------
 if st.session_state.logged_in and st.session_state.user_role == "Teacher":
     st.set_page_config(page_title="Teacher Dashboard", layout="wide")
-    df = st.session_state.file
+    aggregates = get_roster_aggregates(bundle)
 
     st.markdown("## 🧑‍🏫 Welcome Back, Teacher!")
     st.write("Here's your classroom overview and student performance insights.")
@@ -242,8 +224,8 @@ if st.session_state.logged_in and st.session_state.user_role == "Teacher":
 
     with col3:
         st.subheader("Top 3 Students")
-        top_students = df.sort_values("Predicted_Final_Score", ascending=False).head(3)
-        st.table(top_students[["Student_ID", "First_Name", "Predicted_Final_Score"]].reset_index(drop=True))
+        top_students = aggregates.top_students(3)
+        st.table(top_students)
 
     st.markdown("---")
 
@@ -255,15 +237,18 @@ if st.session_state.logged_in and st.session_state.user_role == "Teacher":
 
     with col5:
         st.subheader("Grade Distribution")
-        fig = px.histogram(df, x="Predicted_Final_Score", nbins=10, labels={"x": "Predicted Score"}, height=300)
-        fig.update_layout(xaxis_title="Score", yaxis_title="No. of Students")
+        bins = aggregates.histogram_frame()
+        with span("chart.plotly"):
+            fig = go.Figure(go.Bar(x=bins["Score"], y=bins["Students"], width=bins["Width"]))
+            fig.update_layout(xaxis_title="Score", yaxis_title="No. of Students", height=300, bargap=0)
         st.plotly_chart(fig)
 
     with col6:
         st.subheader("Grade Overview")
-        avg_gpa = df["Predicted_Final_Score"].mean()
-        gauge = go.Figure(go.Indicator(mode="gauge+number", value=(avg_gpa / 100) * 10,
-                                       title={'text': "Average"}, gauge={'axis': {'range': [0, 10]}}))
+        avg_gpa = aggregates.score.mean
+        with span("chart.plotly"):
+            gauge = go.Figure(go.Indicator(mode="gauge+number", value=(avg_gpa / 100) * 10,
+                                           title={'text': "Average"}, gauge={'axis': {'range': [0, 10]}}))
         st.plotly_chart(gauge)
 
     with col7:
@@ -315,3 +300,5 @@ st.markdown("""
 
     <a href="Ask_AI" class="floating-btn" target="_self" style="text-decoration: none; color: white;">💬 Ask AI</a>
 """, unsafe_allow_html=True)
+
+finish_rerun()
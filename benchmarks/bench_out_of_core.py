@@ -0,0 +1,117 @@
+"""Out-of-core training: time and peak memory of ChunkedTrainer on a file on disk.
+
+A synthetic roster is written to disk chunk by chunk (see
+``benchmarks.synthetic``), then trained on in a fresh interpreter so the peak
+resident memory reported is the training's own. With ``--compare`` the same
+file is also loaded whole and fitted with sklearn on the same hashed split, to
+check the coefficients and metrics and show the memory it takes.
+
+Run from the repository root:
+    python -m benchmarks.bench_out_of_core --rows 1e6 --compare
+    python -m benchmarks.bench_out_of_core --rows 3e7 --format arrow
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from utils.chunked_training import CHUNK_ROWS, ChunkedTrainer
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kilobytes on Linux
+
+
+def run_chunked(path, chunk_rows):
+    before = peak_rss_mb()
+    trainer = ChunkedTrainer(path, chunk_rows=chunk_rows)
+    model = trainer.fit()
+    return {**trainer.report(), "coef": model.coef_.tolist(), "intercept": model.intercept_,
+            "peak_mb": peak_rss_mb(), "baseline_mb": before}
+
+
+def run_in_memory(path):
+    # Imported here so the chunked run's peak memory does not include sklearn
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    from utils.chunked_training import KEY_COLUMN, TARGET, test_mask
+    from utils.predictor import FEATURES
+
+    before = peak_rss_mb()
+    started = time.perf_counter()
+    df = pd.read_csv(path) if path.endswith(".csv") else pd.read_parquet(path) if path.endswith(".parquet") \
+        else pd.read_feather(path)
+    test = test_mask(df[KEY_COLUMN])
+    model = LinearRegression().fit(df.loc[~test, FEATURES], df.loc[~test, TARGET])
+    predicted = model.predict(df.loc[test, FEATURES])
+    return {"elapsed": time.perf_counter() - started, "coef": model.coef_.tolist(),
+            "intercept": float(model.intercept_), "r2": r2_score(df.loc[test, TARGET], predicted),
+            "rmse": float(np.sqrt(mean_squared_error(df.loc[test, TARGET], predicted))),
+            "peak_mb": peak_rss_mb(), "baseline_mb": before}
+
+
+def child(mode, path, chunk_rows):
+    command = [sys.executable, "-m", "benchmarks.bench_out_of_core", "--child", mode, path, str(chunk_rows)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=float, default=1e6)
+    parser.add_argument("--format", choices=["csv", "parquet", "arrow"], default="arrow")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--path", help="train on this file instead of writing a synthetic one")
+    parser.add_argument("--compare", action="store_true", help="also fit in memory with sklearn on the same split")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "PATH", "CHUNK_ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, path, chunk_rows = args.child
+        result = run_chunked(path, int(chunk_rows)) if mode == "chunked" else run_in_memory(path)
+        print(json.dumps(result))
+        return
+
+    path = args.path
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), f"roster.{args.format}")
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "benchmarks.synthetic", "--rows", str(int(args.rows)), "--out", path],
+                       check=True, capture_output=True)
+        print(f"wrote {int(args.rows):,} students to {path} ({os.path.getsize(path) / 2 ** 20:,.0f} MB) "
+              f"in {time.perf_counter() - started:.1f} s")
+    try:
+        runs = [("chunked", child("chunked", path, args.chunk_rows))]
+        if args.compare:
+            runs.append(("in memory", child("in_memory", path, args.chunk_rows)))
+
+        print(f"\n{'mode':<10} {'seconds':>8} {'rows/s':>12} {'peak MB':>8} {'growth MB':>10} {'R²':>8} {'RMSE':>8}")
+        rows = runs[0][1]["rows"]
+        for mode, result in runs:
+            print(f"{mode:<10} {result['elapsed']:8.2f} {rows / result['elapsed']:12,.0f} {result['peak_mb']:8.0f} "
+                  f"{result['peak_mb'] - result['baseline_mb']:10.0f} {result['r2']:8.4f} {result['rmse']:8.4f}")
+        chunked = runs[0][1]
+        print(f"\n{chunked['train_rows']:,} training and {chunked['test_rows']:,} test rows in {chunked['chunks']:,} "
+              f"chunks, {chunked['skipped']:,} skipped")
+        if args.compare:
+            in_memory = runs[1][1]
+            difference = np.abs(np.array(chunked["coef"]) - np.array(in_memory["coef"])).max()
+            print(f"max |coefficient difference| vs sklearn: {difference:.2e}")
+    finally:
+        if args.path is None:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
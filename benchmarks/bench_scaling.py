@@ -0,0 +1,169 @@
+"""Scaling: time and peak memory of the main computations from 1k to 10M students.
+
+Each step runs on a synthetic roster (see ``benchmarks.synthetic``); its time
+is the best of ``--repeat`` runs, and a separate run under tracemalloc gives
+its peak allocated memory. Results are appended to a
+JSON-lines file tagged with the git commit, and every step is compared with
+the latest earlier run at the same size.
+
+Run from the repository root:
+    python -m benchmarks.bench_scaling
+    python -m benchmarks.bench_scaling --sizes 1e3,1e4,1e5,1e6,1e7
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_roster
+from utils.aggregates import RosterAggregates
+from utils.charts import box_stats, pairwise_histograms, thin_scatter
+from utils.predictor import COLS_TO_SHOW, FEATURES, predict
+from utils.scoring import FastScorer, score_roster
+from utils.sharding import train_shards
+
+RESULTS_PATH = os.path.join("benchmarks", "results", "scaling.jsonl")
+DEFAULT_SIZES = "1e3,1e4,1e5,1e6"
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_SECONDS = 0.005  # smaller differences are timer noise
+NUMERIC = FEATURES + ["Final_Score"]
+SINGLE_CALLS = 10_000
+
+
+def steps(roster):
+    """``(name, function)`` pairs; later steps use what earlier ones returned."""
+    state = {}
+
+    def fit():
+        state["result"] = predict(roster)
+
+    def score_single():
+        scorer = FastScorer(state["result"][-1])
+        student = roster.iloc[0][FEATURES].to_dict()
+        for _ in range(SINGLE_CALLS):
+            scorer(student)
+
+    def score_bulk():
+        # Added in place: a scored copy of a 10M-row roster would double the memory held between steps
+        roster["Predicted_Final_Score"] = score_roster(roster, state["result"][-1])["Predicted_Final_Score"].to_numpy()
+
+    def fit_shards():
+        state["sharded"] = train_shards(roster, fallback=state["result"][-1])
+
+    def score_sharded():
+        score_roster(roster, state["sharded"])
+
+    def aggregates_build():
+        state["aggregates"] = RosterAggregates.build(roster[COLS_TO_SHOW])
+
+    def dashboard_reads():
+        aggregates = state["aggregates"]
+        aggregates.top_students(3)
+        aggregates.histogram_frame()
+        aggregates.score.mean
+
+    def stats_summary():
+        state["aggregates"].summary()
+        state["aggregates"].group_summary()
+
+    def stats_charts():
+        thin_scatter(roster, "Attendance", "Final_Score")
+        box_stats(roster, "Department", "Final_Score")
+
+    def stats_pairplot():
+        pairwise_histograms(roster[NUMERIC].to_numpy(dtype=np.float64))
+
+    return [(f.__name__, f) for f in (fit, score_single, score_bulk, fit_shards, score_sharded, aggregates_build,
+                                      dashboard_reads, stats_summary, stats_charts, stats_pairplot)]
+
+
+def run_size(rows, repeat=3, memory=True):
+    """Yields one record per step as soon as it has been measured."""
+    started = time.perf_counter()
+    roster = synthetic_roster(rows)
+    yield {"step": "generate", "seconds": time.perf_counter() - started, "peak_mb": None}
+
+    for name, function in steps(roster):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - started)
+        peak = None
+        if memory:
+            # A separate traced run, so tracemalloc's overhead stays out of the timing
+            tracemalloc.start()
+            function()
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        yield {"step": name, "seconds": best, "peak_mb": peak}
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated row counts, e.g. 1e3,1e6,1e7")
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSON-lines file results are appended to")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per step; the best is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [int(float(size)) for size in args.sizes.split(",")]
+    history = load_results(args.results)
+    run = {"run": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+           "python": platform.python_version(), "numpy": np.__version__}
+    new = []
+
+    list(run_size(1_000, repeat=1, memory=False))  # warm-up: lazy imports and first-call costs
+
+    print(f"commit {run['commit']}")
+    print(f"{'rows':>10} {'step':<17} {'seconds':>10} {'peak MB':>9} {'previous':>10} {'ratio':>6}")
+    for rows in sizes:
+        for record in run_size(rows, args.repeat, memory=not args.no_memory):
+            record = {**run, "rows": rows, **record}
+            new.append(record)
+            previous = next((r for r in reversed(history)
+                             if r["rows"] == rows and r["step"] == record["step"]), None)
+            peak = f"{record['peak_mb']:9.1f}" if record["peak_mb"] is not None else f"{'-':>9}"
+            line = f"{rows:>10,} {record['step']:<17} {record['seconds']:10.4f} {peak}"
+            if previous:
+                ratio = record["seconds"] / previous["seconds"] if previous["seconds"] else float("inf")
+                slower = ratio > REGRESSION_RATIO and record["seconds"] - previous["seconds"] > REGRESSION_MIN_SECONDS
+                flag = "  slower" if slower else ""
+                line += f" {previous['seconds']:10.4f} {ratio:5.2f}x{flag}"
+            print(line, flush=True)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.results) or ".", exist_ok=True)
+        with open(args.results, "a") as f:
+            for record in new:
+                f.write(json.dumps(record) + "\n")
+        print(f"\nResults appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Single-student scoring: DataFrame + sklearn predict vs FastScorer.
+
+Run from the repository root:
+    python -m benchmarks.bench_single_student
+"""
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from utils.predictor import FEATURES, predict
+from utils.scoring import FastScorer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default="Student Performance Sample.csv")
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    model = predict(df)[-1]
+    scorer = FastScorer(model)
+    students = df[FEATURES].to_dict("records")
+
+    # Same answers as the current path before timing anything
+    expected = model.predict(df[FEATURES])
+    actual = np.array([scorer(student) for student in students])
+    max_diff = np.abs(actual - expected).max()
+    assert max_diff < 1e-9, f"FastScorer disagrees with sklearn by {max_diff}"
+
+    student = students[0]
+    slow = min(timeit.repeat(lambda: model.predict(pd.DataFrame([student]))[0],
+                             number=args.number // 10, repeat=5)) / (args.number // 10)
+    fast = min(timeit.repeat(lambda: scorer(student), number=args.number, repeat=5)) / args.number
+
+    print(f"max |difference|       : {max_diff:.2e}")
+    print(f"DataFrame + predict()  : {slow * 1e6:10.2f} us/student")
+    print(f"FastScorer             : {fast * 1e6:10.2f} us/student")
+    print(f"speedup                : {slow / fast:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
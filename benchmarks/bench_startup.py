@@ -0,0 +1,116 @@
+"""Cold-start budget: import time and first render of every page.
+
+Each measurement runs in a fresh interpreter. "imports" executes only the
+page's top-level import statements (after streamlit itself, which every page
+shares); "render" is the first AppTest run of the page. The logged-out
+Dashboard is rendered from a cold process, as the first visitor sees it; the
+other pages are rendered as a teacher once the training worker has served a
+model, as they are reached after logging in.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+
+Exits with status 1 if any page goes over its budget.
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+import time
+
+# page, role it is rendered as, budget in seconds for (imports, render)
+PAGES = [
+    ("Dashboard.py", None, (1.0, 1.75)),
+    ("Dashboard.py", "Teacher", (1.0, 0.75)),
+    ("pages/1_Stats.py", "Teacher", (1.25, 1.0)),
+    ("pages/2_Grade_Predictor.py", "Teacher", (1.5, 1.0)),
+    ("pages/3_Upload_Marksheet.py", "Teacher", (1.0, 0.5)),
+    ("pages/4_Ask_AI.py", "Teacher", (1.25, 0.75)),
+    ("pages/5_Performance.py", "Teacher", (1.0, 0.5)),
+]
+
+
+def time_imports(page):
+    with open(page, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), page)
+    imports = ast.Module([node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))], [])
+    code = compile(imports, page, "exec")
+    started = time.perf_counter()
+    exec(code, {})
+    return time.perf_counter() - started
+
+
+def time_render(page, role):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(page, default_timeout=120)
+    if role:
+        from utils.training_worker import get_training_worker
+
+        bundle = get_training_worker().current()
+        at.session_state["logged_in"] = True
+        at.session_state["user_role"] = role
+        at.session_state["teacher_email"] = "teacher@example.com"
+        at.session_state["student_row"] = None
+        at.session_state["file"] = bundle["roster"]
+        at.session_state["model"] = bundle["result"][-1]
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(f"{page} raised: {at.exception[0].message}")
+    return elapsed
+
+
+def measure(mode, page, role):
+    """Run one measurement in a fresh interpreter and return the seconds it took."""
+    command = [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode, page, role or ""]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])["seconds"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per measurement; the best is kept")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every budget, e.g. on slow CI")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "PAGE", "ROLE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, page, role = args.child
+        import streamlit  # noqa: F401  shared by every page, not part of its budget
+
+        seconds = time_imports(page) if mode == "imports" else time_render(page, role or None)
+        print(json.dumps({"seconds": seconds}))
+        return
+
+    over, import_times = [], {}
+    print(f"{'page':<30} {'role':<8} {'imports':>9} {'budget':>7} {'render':>9} {'budget':>7}")
+    for page, role, (import_budget, render_budget) in PAGES:
+        if page not in import_times:
+            import_times[page] = min(measure("imports", page, role) for _ in range(args.repeat))
+        imports = import_times[page]
+        render = min(measure("render", page, role) for _ in range(args.repeat))
+        import_budget *= args.budget_scale
+        render_budget *= args.budget_scale
+        flags = ""
+        if imports > import_budget:
+            over.append(f"{page} imports")
+            flags += " imports over budget"
+        if render > render_budget:
+            over.append(f"{page} render")
+            flags += " render over budget"
+        print(f"{page:<30} {role or '-':<8} {imports:8.3f}s {import_budget:6.2f}s "
+              f"{render:8.3f}s {render_budget:6.2f}s{flags}")
+
+    if over:
+        print(f"\nOver budget: {', '.join(over)}")
+        sys.exit(1)
+    print("\nAll pages within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Load test: many concurrent scripted sessions against a locally started app.
+
+Starts the SMTP and Groq stand-ins and ``streamlit run Dashboard.py`` wired to
+them, then, for each session count, keeps that many virtual users busy for
+``--duration`` seconds. Each user opens a fresh session over Streamlit's
+websocket protocol and plays a student or teacher script (login, dashboard,
+Stats, Grade Predictor, Ask AI); every widget change is one rerun, timed from
+the message that triggers it to the end of the script run.
+
+Run from the repository root:
+    python -m benchmarks.load_test --sessions 1,5,10,25 --duration 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+from stubs.groq_server import GroqStub
+from stubs.smtp_server import SMTPStub
+
+STARTUP_TIMEOUT = 120
+
+
+class Session:
+    """One browser tab: sends reruns with the current widget states and times each script run."""
+
+    def __init__(self, url, record):
+        self.url = url
+        self.record = record
+        self.pages = {}
+        self.page_hash = ""
+        self.widgets = {}
+        self.states = {}
+
+    async def open(self):
+        self.ws = await websocket_connect(self.url, max_message_size=256 * 2 ** 20)
+        await self.rerun("load")
+
+    def close(self):
+        self.ws.close()
+
+    async def rerun(self, step, trigger=None):
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_script_hash = self.page_hash
+        client_state.widget_states.widgets.extend(self.states.values())
+        if trigger is not None:
+            client_state.widget_states.widgets.append(trigger)
+
+        started = time.perf_counter()
+        await self.ws.write_message(message.SerializeToString(), binary=True)
+        error = None
+        while True:
+            raw = await self.ws.read_message()
+            if raw is None:
+                raise ConnectionError("server closed the session")
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                # Sent at the start of every run, including reruns requested by the script itself
+                self.pages = {page.page_name: page.page_script_hash for page in forward.new_session.app_pages}
+                self.page_hash = forward.new_session.page_script_hash
+                self.widgets = {}
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    error = element.exception.message
+                widget_id = getattr(getattr(element, element_type), "id", "")
+                if widget_id:
+                    self.widgets[(element_type, getattr(getattr(element, element_type), "label", ""))] = widget_id
+            elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+
+        # Like the browser, keep sending only the values of widgets that are still on the page
+        alive = set(self.widgets.values())
+        self.states = {widget_id: state for widget_id, state in self.states.items() if widget_id in alive}
+        self.record(step, time.perf_counter() - started, error)
+
+    def _widget(self, element_type, label):
+        return self.widgets[(element_type, label)]
+
+    async def change(self, element_type, label, **value):
+        state = WidgetState(id=self._widget(element_type, label), **value)
+        self.states[state.id] = state
+        await self.rerun(f"{element_type}: {label}")
+
+    async def click(self, label):
+        await self.rerun(f"click: {label}", WidgetState(id=self._widget("button", label), trigger_value=True))
+
+    async def chat(self, text):
+        state = WidgetState(id=self._widget("chat_input", ""))
+        state.chat_input_value.data = text
+        await self.rerun("chat", state)
+
+    async def goto(self, page):
+        self.page_hash = self.pages[page]
+        self.states = {}
+        await self.rerun(f"page: {page}")
+
+
+async def student(session, think):
+    await session.change("selectbox", "Are you a Student or a Teacher?", string_value="Student")
+    await think()
+    await session.change("text_input", "Enter your Name", string_value="Load Test")
+    await session.change("text_input", "Enter your Email ID", string_value="student@example.com")
+    await session.change("number_input", "Enter your Mid Term Score", double_value=random.uniform(40, 95))
+    await think()
+    await session.click("Login")
+    await think()
+    await session.goto("Grade Predictor")
+    await think()
+    await session.goto("Stats")
+    await think()
+    await session.goto("Ask AI")
+    await session.chat("How can I improve my final score?")
+
+
+async def teacher(session, think):
+    await session.change("selectbox", "Are you a Student or a Teacher?", string_value="Teacher")
+    await think()
+    await session.change("text_input", "Enter your Email ID", string_value="teacher@example.com")
+    await session.click("Login")
+    await think()
+    await session.goto("Stats")
+    await think()
+    await session.goto("Grade Predictor")
+    await think()
+    await session.goto("Ask AI")
+    await session.chat("Which students are at risk?")
+
+
+def rss_mb(pid):
+    """Resident memory of ``pid`` from /proc; None where that is not available."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port, smtp, groq):
+    env = dict(os.environ, SMTP_HOST="127.0.0.1", SMTP_PORT=str(smtp.port), SMTP_STARTTLS="0",
+               senderemail="alerts@example.com", senderpass="load-test",
+               GROQ_API_URL=groq.url, GROQ_API_KEY="load-test")
+    command = [sys.executable, "-m", "streamlit", "run", "Dashboard.py", "--server.headless", "true",
+               "--server.port", str(port), "--server.fileWatcherType", "none",
+               "--browser.gatherUsageStats", "false"]
+    # A file rather than a pipe, so a chatty server can never block on a full pipe
+    log = tempfile.TemporaryFile()
+    app = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if app.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"app exited during startup:\n{log.read().decode(errors='replace')}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return app
+        except OSError:
+            time.sleep(0.25)
+    app.terminate()
+    raise RuntimeError("app did not become healthy in time")
+
+
+async def run_stage(url, users, duration, think_time, teacher_share, pid):
+    latencies = defaultdict(list)
+    errors = []
+    sessions = 0
+
+    def record(step, seconds, error):
+        latencies[step].append(seconds)
+        if error:
+            errors.append(f"{step}: {error}")
+
+    async def think():
+        if think_time:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * think_time)
+
+    async def user():
+        nonlocal sessions
+        while time.monotonic() < deadline:
+            script = teacher if random.random() < teacher_share else student
+            session = Session(url, record)
+            try:
+                await session.open()
+                await script(session, think)
+                sessions += 1
+            except Exception as e:
+                errors.append(f"{script.__name__}: {e!r}")
+            finally:
+                if getattr(session, "ws", None) is not None:
+                    session.close()
+
+    peak_rss = 0.0
+
+    async def sample_memory():
+        nonlocal peak_rss
+        while time.monotonic() < deadline:
+            peak_rss = max(peak_rss, rss_mb(pid) or 0.0)
+            await asyncio.sleep(0.25)
+
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(sample_memory(), *(user() for _ in range(users)))
+    elapsed = time.monotonic() - started
+    return latencies, errors, sessions, elapsed, peak_rss
+
+
+def percentiles(values):
+    return np.percentile(values, [50, 95, 99]) if values else np.full(3, np.nan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,5,10,25", help="comma-separated concurrent session counts")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per session count")
+    parser.add_argument("--think", type=float, default=0.5, help="mean pause between user actions, in seconds")
+    parser.add_argument("--teachers", type=float, default=0.3, help="share of sessions that are teachers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    smtp = SMTPStub().start()
+    groq = GroqStub().start()
+    port = free_port()
+    app = start_app(port, smtp, groq)
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    try:
+        # One pass of each script first, so the model is trained and imports are loaded
+        asyncio.run(run_stage(url, 2, 0.1, 0, 0.5, app.pid))
+        idle_rss = rss_mb(app.pid)
+        print(f"app on port {port}, idle memory {idle_rss or float('nan'):.0f} MB\n")
+        print(f"{'sessions':>8} {'scripts':>7} {'reruns':>7} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'errors':>7} {'peak MB':>8} {'MB/session':>10}")
+
+        for users in [int(n) for n in args.sessions.split(",")]:
+            latencies, errors, sessions, elapsed, peak_rss = asyncio.run(
+                run_stage(url, users, args.duration, args.think, args.teachers, app.pid))
+            every = [seconds for values in latencies.values() for seconds in values]
+            p50, p95, p99 = percentiles(every) * 1000
+            per_session = (peak_rss - idle_rss) / users if idle_rss else float("nan")
+            print(f"{users:>8} {sessions:>7} {len(every):>7} {len(every) / elapsed:>9.1f} {p50:>8.0f} {p95:>8.0f} {p99:>8.0f} "
+                  f"{len(errors):>7} {peak_rss:>8.0f} {per_session:>10.1f}")
+            slowest = sorted(latencies.items(), key=lambda item: -percentiles(item[1])[1])[:3]
+            print("         slowest p95: " + ", ".join(
+                f"{step} {percentiles(values)[1] * 1000:.0f} ms" for step, values in slowest))
+            for error in errors[:3]:
+                print(f"         error: {error}")
+
+        print(f"\nStand-ins received {len(smtp.messages)} emails and {len(groq.requests)} chat requests")
+    finally:
+        app.terminate()
+        app.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Synthetic rosters with the same schema and distributions as the sample CSV.
+
+Each student gets a latent "ability" that every score, attendance and study
+hours load on, so the columns are correlated like the sample's; Final_Score is
+the linear model fitted on the sample plus its residual noise. Rows are built
+in chunks, so 10M students fit comfortably in memory, and files are written
+chunk by chunk, so their size is limited only by the disk.
+
+    python -m benchmarks.synthetic --rows 1000000 --out roster.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+SAMPLE_CSV = "Student Performance Sample.csv"
+
+FIRST_NAMES = ["Omar", "Maria", "Ahmed", "John", "Liam", "Sara", "Emma", "Ali"]
+GENDERS = ["Female", "Male"]
+DEPARTMENTS = ["Vocational", "Arts", "Commerce", "Science"]
+DEPARTMENT_SHARES = [0.28, 0.27, 0.25, 0.20]
+
+# column: (mean, std, ability loading, min, max, decimals), from the sample CSV
+COLUMNS = {
+    "Midterm_Score": (66.7, 10.9, 0.6, 40, 100, 0),
+    "Assignments_Avg": (77.8, 9.8, 0.5, 45, 100, 0),
+    "Quizzes_Avg": (73.2, 9.9, 0.4, 40, 100, 0),
+    "Project_Score": (78.2, 9.8, 0.5, 45, 100, 0),
+    "Study_Hours_per_Week": (7.5, 1.5, 0.4, 1, 20, 1),
+    "Sleep_Hours": (6.1, 0.5, -0.2, 3, 10, 1),
+    "Attendance": (83.6, 6.7, 0.6, 40, 100, 1),
+}
+
+# LinearRegression on the sample CSV
+FINAL_INTERCEPT = 7.18
+FINAL_COEFFICIENTS = {
+    "Midterm_Score": 0.279, "Assignments_Avg": 0.201, "Quizzes_Avg": 0.162, "Project_Score": 0.221,
+    "Attendance": 0.064, "Study_Hours_per_Week": 0.111, "Sleep_Hours": -0.488,
+}
+FINAL_NOISE = 1.86
+
+
+def _chunk(start, n, rng):
+    ids = pc.binary_join_element_wise("S", pa.array(np.arange(start, start + n)).cast(pa.string()), "")
+    frame = {
+        "Student_ID": pd.arrays.ArrowStringArray(ids),
+        "First_Name": pd.Categorical.from_codes(rng.integers(0, len(FIRST_NAMES), n), FIRST_NAMES),
+        "Gender": pd.Categorical.from_codes(rng.integers(0, len(GENDERS), n), GENDERS),
+        "Department": pd.Categorical.from_codes(rng.choice(len(DEPARTMENTS), n, p=DEPARTMENT_SHARES), DEPARTMENTS),
+    }
+    ability = rng.standard_normal(n)
+    final = np.full(n, FINAL_INTERCEPT)
+    for column, (mean, std, loading, low, high, decimals) in COLUMNS.items():
+        values = mean + std * (loading * ability + np.sqrt(1 - loading ** 2) * rng.standard_normal(n))
+        values = np.clip(values, low, high).round(decimals)
+        frame[column] = values.astype(np.int64) if decimals == 0 else values
+        final += FINAL_COEFFICIENTS[column] * values
+    frame["Internet_Access"] = pd.Categorical.from_codes(rng.integers(0, 2, n), ["No", "Yes"])
+    frame["Final_Score"] = np.clip(final + FINAL_NOISE * rng.standard_normal(n), 0, 100).round(1)
+    return pd.DataFrame(frame)
+
+
+def _chunks(rows, seed, chunk_rows, first_id):
+    rng = np.random.default_rng(seed)
+    columns = list(pd.read_csv(SAMPLE_CSV, nrows=0).columns)
+    for start in range(0, rows, chunk_rows):
+        yield _chunk(first_id + start, min(chunk_rows, rows - start), rng)[columns]
+
+
+def synthetic_roster(rows, seed=0, chunk_rows=1_000_000, first_id=1000):
+    """``rows`` synthetic students in the sample CSV's column order."""
+    chunks = list(_chunks(rows, seed, chunk_rows, first_id))
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def write_synthetic(path, rows, seed=0, chunk_rows=1_000_000, first_id=1000):
+    """Write the same students as ``synthetic_roster`` to a CSV, Parquet or Arrow file, one chunk in memory at a time."""
+    ext = os.path.splitext(path)[1].lower()
+    writer = None
+    try:
+        for i, chunk in enumerate(_chunks(rows, seed, chunk_rows, first_id)):
+            if ext == ".csv":
+                chunk.to_csv(path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+                continue
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = (pq.ParquetWriter(path, table.schema) if ext == ".parquet"
+                          else pa.ipc.new_file(path, table.schema))
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="CSV, .parquet or .arrow path")
+    args = parser.parse_args()
+
+    write_synthetic(args.out, args.rows, args.seed)
+    print(f"Wrote {args.rows:,} students to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,18 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
 
+from utils.aggregates import get_roster_aggregates
+from utils.charts import box_figure, cached_pairplot, scatter_figure
+from utils.student_db import get_student_store
+from utils.telemetry import finish_rerun, start_rerun
+from utils.training_worker import get_training_worker
+
+start_rerun("Stats")
 st.set_page_config(page_title="Stats", layout="wide")
 
 st.title("📊 Data Stats Dashboard")
 
-df = st.session_state.file
+df = st.session_state.get("file")
 
 if st.session_state.user_role == "Teacher":
     # Check if file was uploaded
@@ -18,24 +21,33 @@ if st.session_state.user_role == "Teacher":
 
     # Show basic info
     st.subheader("Dataset Summary")
-    st.write(df.describe())
+    bundle = get_training_worker().current()
+    aggregates = get_roster_aggregates(bundle)
+    st.write(aggregates.summary())
+    st.write("Predicted score by department")
+    st.dataframe(aggregates.group_summary(), hide_index=True)
 
     st.subheader("View Individual Student")
 
-    student_id = st.selectbox("Select a student ID", df["Student_ID"].unique())
-    student_data = df[df["Student_ID"] == student_id].iloc[0]
+    store = get_student_store()
+    student_id = st.selectbox("Select a student ID", store.student_ids())
+    student_data = store.get_student(student_id)
 
-    st.markdown(f"### 👤 {student_data['First_Name']} (ID: {student_id})")
+    # None when the roster is empty, or the student left it in a retrain since the list was drawn
+    if student_data is None:
+        st.info("No record for this student in the current roster. Pick another student ID.")
+    else:
+        st.markdown(f"### 👤 {student_data['First_Name']} (ID: {student_id})")
 
-    col4, col5 = st.columns(2)
+        col4, col5 = st.columns(2)
 
-    with col4:
-        st.metric("Midterm Score", f"{student_data['Midterm_Score']}%")
-        st.metric("Final Score", f"{student_data['Predicted_Final_Score']}%")
+        with col4:
+            st.metric("Midterm Score", f"{student_data['Midterm_Score']}%")
+            st.metric("Final Score", f"{student_data['Predicted_Final_Score']}%")
 
-    with col5:
-        st.metric("Study Hours/Week", f"{student_data['Study_Hours_per_Week']} hrs")
-        st.metric("Sleep Hours", f"{student_data['Sleep_Hours']} hrs")
+        with col5:
+            st.metric("Study Hours/Week", f"{student_data['Study_Hours_per_Week']} hrs")
+            st.metric("Sleep Hours", f"{student_data['Sleep_Hours']} hrs")
 
     st.markdown("---")
 
@@ -47,24 +59,26 @@ if st.session_state.user_role == "Teacher":
     y_col = st.selectbox("Select Y-axis feature", df.columns)
 
     if pd.api.types.is_numeric_dtype(df[x_col]) and pd.api.types.is_numeric_dtype(df[y_col]):
-        fig = px.scatter(df, x=x_col, y=y_col, color=df.columns[-1], title=f"{y_col} vs {x_col}")
+        fig = scatter_figure(df, x_col, y_col, color=df.columns[-1], title=f"{y_col} vs {x_col}")
         st.plotly_chart(fig)
     else:
         st.warning("Please select numeric columns for scatter plot.")
 
     # Bar plot for categorical impact
     st.subheader("Categorical Feature Impact")
-    cat_col = st.selectbox("Select a Categorical Feature", df.select_dtypes(include='object').columns)
+    cat_col = st.selectbox("Select a Categorical Feature", df.select_dtypes(include=['object', 'category']).columns)
     num_col = st.selectbox("Select a Numeric Feature", numeric_df.columns)
 
-    fig2 = px.box(df, x=cat_col, y=num_col, points="all", title=f"{num_col} Distribution by {cat_col}")
+    fig2 = box_figure(df, cat_col, num_col, title=f"{num_col} Distribution by {cat_col}")
     st.plotly_chart(fig2)
 
-    # Optional: Pairplot with Seaborn (for full relationship matrix)
+    # Optional: Pairplot (for full relationship matrix), rendered once per dataset version
     st.subheader("Pairplot of Numeric Features")
-    if st.checkbox("Show Pairplot (Warning: Can be slow)"):
-        fig3 = sns.pairplot(numeric_df)
-        st.pyplot(fig3)
+    if st.checkbox("Show Pairplot"):
+        mode = st.radio("Pairplot style", ["Binned density", "Sampled scatter"], horizontal=True)
+        image = cached_pairplot(df, list(numeric_df.columns), bundle["model_key"],
+                                mode="density" if mode == "Binned density" else "scatter")
+        st.image(image)
 
 if st.session_state.user_role == "Student":
     email = st.session_state.student_row['Email_ID']
@@ -160,3 +174,5 @@ st.markdown("""
 
     <a href="Ask_AI" class="floating-btn" target="_self" style="text-decoration: none; color: white;">💬 Ask AI</a>
 """, unsafe_allow_html=True)
+
+finish_rerun()
@@ -1,49 +1,52 @@
 import textwrap
 import streamlit as st
 import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
 import plotly.graph_objects as go
-import os
 from dotenv import find_dotenv, load_dotenv
-import smtplib
-from email.message import EmailMessage
 from tabulate import tabulate
 
+from utils.advice import AdviceBatch, at_risk_students, get_advice_store
+from utils.campaign import ALERT_SUBJECT, Campaign, alert_body, at_risk_messages, parquet_at_risk_messages
+from utils.model_cache import MODEL_CACHE
+from utils.model_selection import FOLDS, get_model_evaluator
+from utils.outbox import get_outbox
+from utils.scoring import THRESHOLDS, describe_reasons, make_scorer
+from utils.student_db import get_student_store
+from utils.telemetry import finish_rerun, span, start_rerun
+from utils.training_worker import get_training_worker
+
+start_rerun("Grade Predictor")
+
 dotenv_path = find_dotenv()
 load_dotenv(dotenv_path)
 
-senderemail = os.getenv("senderemail")
-senderpass = os.getenv("senderpass")
+outbox = get_outbox()
 
 
-def predict(df):
-    y = df['Final_Score']
-    features = [
-        'Midterm_Score', 'Assignments_Avg', 'Quizzes_Avg', 'Project_Score',
-        'Attendance', 'Study_Hours_per_Week', 'Sleep_Hours'
-    ]
-    X = df[features]
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42)
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
-    r2 = r2_score(y_test, y_pred)
-    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-    test_students = df.loc[X_test.index].copy()
-    test_students['Predicted_Final_Score'] = y_pred
-    results_df = test_students[['First_Name', 'Final_Score', 'Predicted_Final_Score']]
-    return r2, rmse, results_df, test_students, features, model
+def show_outbox():
+    """Delivery status of the emails this session has queued."""
+    jobs = outbox.statuses(st.session_state.get("email_jobs", []))
+    if jobs:
+        with st.sidebar:
+            st.subheader("📬 Outbox")
+            st.dataframe(pd.DataFrame(jobs)[["to", "subject", "status", "attempts", "error"]], hide_index=True)
+
+
+def queue_email(to, subject, body):
+    job_id = outbox.enqueue(to, subject, body)
+    jobs = st.session_state.setdefault("email_jobs", [])
+    if job_id not in jobs:
+        jobs.append(job_id)
+    return job_id
+
 
 # Safe session state initialization
-if "model" not in st.session_state:
-    raw_data = pd.read_csv("Student Performance Sample.csv")
-    r2, rmse, results_df, test_students, features, model = predict(raw_data)
-    st.session_state.model = model
-    st.session_state.full_df = raw_data
+bundle = get_training_worker().current()
+if st.session_state.get("model_version") != bundle["version"]:
+    st.session_state.file = bundle["roster"]
+    st.session_state.model = bundle.get("router", bundle["result"][-1])
+    st.session_state.full_df = bundle["dataset"]
+    st.session_state.model_version = bundle["version"]
 
 st.title("📊 Grade Predictor")
 
@@ -93,92 +96,51 @@ if st.session_state.user_role == "Student":
             st.metric("Hours Studied", student_row["Study_Hours_per_Week"])
 
         #Prediction
-        model = st.session_state.model
-        features = [
-            'Midterm_Score', 'Assignments_Avg', 'Quizzes_Avg', 'Project_Score',
-            'Attendance', 'Study_Hours_per_Week', 'Sleep_Hours'
-        ]
-        student_data = pd.DataFrame([[student_row[x] for x in features]], columns=features)
-        predicted_score = model.predict(student_data)[0]
+        scorer = make_scorer(st.session_state.model)
+        predicted_score = scorer(student_row)
         st.markdown("### 🎯 Predicted Final Score")
         st.success(f"Your predicted final score is **{predicted_score:.2f}**")
 
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=predicted_score,
-            title={'text': "Predicted Final Score"},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': "green"},
-                'steps': [
-                    {'range': [0, 50], 'color': "red"},
-                    {'range': [50, 70], 'color': "yellow"},
-                    {'range': [70, 100], 'color': "lightgreen"},
-                ],
-            }
-        ))
+        with span("chart.plotly"):
+            fig = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=predicted_score,
+                title={'text': "Predicted Final Score"},
+                gauge={
+                    'axis': {'range': [0, 100]},
+                    'bar': {'color': "green"},
+                    'steps': [
+                        {'range': [0, 50], 'color': "red"},
+                        {'range': [50, 70], 'color': "yellow"},
+                        {'range': [70, 100], 'color': "lightgreen"},
+                    ],
+                }
+            ))
         st.plotly_chart(fig, use_container_width=True)
 
-    thresholds = {
-        "Midterm_Score": 65,  # <65 suggests weak base
-        "Assignments_Avg": 70,  # <70 suggests missing or poor assignments
-        "Quizzes_Avg": 70,  # <70 is weak quiz performance
-        "Project_Score": 70,  # <70 suggests poor practical work
-        "Study_Hours_per_Week": 10,  # <10 hours/week is insufficient
-        "Sleep_Hours": 6,  # <6 hours may impact focus
-        "Attendance": 75  # <75% attendance is usually poor
-    }
+    thresholds = THRESHOLDS
 
     if predicted_score < 70:
-        reasons = []
-
-        for column, threshold in thresholds.items():
-            if column in student_row and student_row[column] < threshold:
-                reasons.append(
-                    f"{column.replace('_', ' ')} is {student_row[column]}, which is below the threshold of {threshold}")
+        reasons = describe_reasons(student_row, thresholds)
 
         # Prepare and send email
         if reasons:
             student_email = st.session_state.student_row['Email_ID']  # Adjust if your column is named differently
 
-            subject = "Academic Performance Alert"
-            body = f"""
-    Hi {student_row['First_Name']},
-
-    We noticed that your predicted final score is below 70. Based on our analysis, the following factors may be contributing to this:
+            subject = ALERT_SUBJECT
+            body = alert_body(student_row['First_Name'], reasons)
 
-    - {chr(10).join(reasons)}
+            # Queued for the background sender; identical alerts on later reruns are deduplicated
+            queue_email(student_email, subject, body)
 
-    We recommend addressing these areas to improve your performance.
-
-    Best,
-    Model Minds Team
-    """
-
-            # Sending the email (fill in your email credentials)
-            sender_email = senderemail
-            password = senderpass # ⚠️ Best to use environment variable or secrets manager
-
-            msg = EmailMessage()
-            msg.set_content(body)
-            msg['Subject'] = subject
-            msg['From'] = senderemail
-            msg['To'] = email
-
-            with smtplib.SMTP('smtp.gmail.com', 587) as smtp:
-                smtp.starttls()
-                smtp.login(senderemail, senderpass)
-                smtp.send_message(msg)
-
-            st.success(f"Email sent to {st.session_state.student_row['Email_ID']} with the reasons for low score.")
+            st.success(f"Email queued for {student_email} with the reasons for low score.")
         else:
             st.info("Final score is low, but no major issues found in contributing factors.")
     else:
         st.success("Final score is satisfactory. No email sent.")
 
 if st.session_state.user_role == "Teacher":
-    raw_data = pd.read_csv("Student Performance Sample.csv")
-    r2, rmse, results_df, test_students, features, model = predict(raw_data)
+    r2, rmse, results_df, test_students, features, model = bundle["result"]
     df = st.session_state.full_df
 
     st.header('Raw Data')
@@ -194,12 +156,44 @@ if st.session_state.user_role == "Teacher":
     st.write(f"**R² Score:** {r2:.4f}")
     st.write(f"**RMSE:** {rmse:.4f}")
     st.text('The low RMSE score shows the accuracy of the findings.')
+    cache_stats = MODEL_CACHE.stats()
+    st.caption(f"Model v{bundle['version']} trained {bundle['trained_at']} · "
+               f"cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+               f"({cache_stats['size']}/{cache_stats['maxsize']} models)")
+    router = bundle.get("router")
+    if router is not None:
+        st.write(f"Scoring with one model per {router.shard_key}; the global model covers the rest:")
+        st.dataframe(router.summary().round(4), hide_index=True)
+
+    # Cross-validation runs in worker processes; reruns only read how far it has got
+    st.subheader("🧪 Model Comparison")
+    st.write(f"The metrics above come from a single 80/20 split. {FOLDS}-fold cross-validation of each "
+             "candidate model gives a steadier comparison.")
+    evaluator = get_model_evaluator()
+    evaluation = evaluator.get(bundle["fingerprint"])
+    if evaluation is None or evaluation.error:
+        if st.button("Compare models"):
+            evaluation = evaluator.evaluate(st.session_state.full_df, bundle["fingerprint"])
+    if evaluation is not None:
+        report = evaluation.report()
+        if report["running"]:
+            st.progress(report["finished"] / report["total"],
+                        f"{report['finished']} of {report['total']} folds done")
+        if report["error"]:
+            st.error(f"Cross-validation failed: {report['error']}")
+        results = evaluation.summary()
+        if len(results):
+            st.dataframe(results.round(4), hide_index=True)
+            sample = f"{report['rows']:,} students" + (" (sampled)" if report["sampled"] else "")
+            workers = f"{report['workers']} worker process" + ("es" if report["workers"] > 1 else "")
+            st.caption(f"Model v{bundle['version']} · {sample} · {workers} · "
+                       f"{report['elapsed']:.1f} s · sorted by mean RMSE, lower is better")
+        if report["running"]:
+            st.button("Refresh results")
 
     st.subheader("Top 10 individual predictions")
-    final_students = test_students.sort_values('Predicted_Final_Score', ascending=False)
-    st.dataframe(final_students.head(10))
+    st.dataframe(test_students.nlargest(10, 'Predicted_Final_Score'))
 
-    st.session_state.final_students = final_students
     risk_alert = st.checkbox(
         "Would you like to receive a mail about the students predicted to score less than the threshold?")
     if risk_alert:
@@ -207,14 +201,11 @@ if st.session_state.user_role == "Teacher":
                                      options=[10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
         button = st.button("Send Email")
         if button:
-            risk_students = []
-            for _, row in st.session_state.file.iterrows():
-                if row['Predicted_Final_Score'] < int(threshold):
-                    risk_students.append({
-                        "Student_Name": row["First_Name"],
-                        "Student_ID": row['Student_ID'],
-                        "Final_Score": row['Predicted_Final_Score']
-                    })
+            flagged = get_student_store().below_threshold(threshold)
+            risk_students = (
+                flagged.rename(columns={"First_Name": "Student_Name", "Predicted_Final_Score": "Final_Score"})
+                .to_dict("records")
+            )
 
             teacher_email = st.session_state.teacher_email
 
@@ -234,21 +225,70 @@ if st.session_state.user_role == "Teacher":
     Model Minds Team
     """)
 
-            sender_email = senderemail
-            password = senderpass
-
-            msg = EmailMessage()
-            msg.set_content(body)
-            msg['Subject'] = subject
-            msg['From'] = sender_email
-            msg['To'] = st.session_state.teacher_email
+            queue_email(teacher_email, subject, body)
 
-            with smtplib.SMTP('smtp.gmail.com', 587) as smtp:
-                smtp.starttls()
-                smtp.login(sender_email, password)
-                smtp.send_message(msg)
+            st.success(f"Email queued!")
 
-            st.success(f"Email sent!")
+    # Campaign: one personalized alert per at-risk student, in a single pass over the roster
+    st.subheader("📣 Alert At-Risk Students")
+    uploaded_store = st.session_state.get("uploaded_store")
+    source = "the uploaded marksheet" if uploaded_store else "the class roster"
+    cutoff = st.slider("Alert students predicted below", min_value=10, max_value=100, value=70, step=5)
+    if st.button(f"Email every at-risk student in {source}"):
+        if uploaded_store:
+            messages, skipped = parquet_at_risk_messages(uploaded_store, st.session_state.model, cutoff)
+        else:
+            messages, skipped = at_risk_messages(st.session_state.full_df, st.session_state.model, cutoff)
+        st.session_state.campaign = Campaign(messages, outbox, skipped=skipped)
+
+    campaign = st.session_state.get("campaign")
+    if campaign is not None:
+        report = campaign.report()
+        if report["total"]:
+            st.progress((report["sent"] + report["failed"]) / report["total"],
+                        f"{report['sent']:,} of {report['total']:,} sent")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Sent", f"{report['sent']:,}")
+        col2.metric("Failed", f"{report['failed']:,}")
+        col3.metric("No email on file", f"{report['skipped']:,}")
+        col4.metric("Emails / sec", f"{report['per_second']:.1f}")
+        if report["failures"]:
+            st.dataframe(pd.DataFrame(report["failures"])[["to", "attempts", "error"]], hide_index=True)
+        if report["pending"]:
+            st.button("Refresh status")
+
+    # Improvement notes: one request per distinct student profile, many in flight at once
+    st.subheader("📝 Improvement Notes")
+    notes_cutoff = st.slider("Write notes for students predicted below", min_value=10, max_value=100, value=70,
+                             step=5)
+    concurrency = st.number_input("Parallel requests", min_value=1, max_value=32, value=8)
+    if st.button("Generate improvement notes"):
+        students = at_risk_students(st.session_state.full_df, st.session_state.model, notes_cutoff)
+        if students.empty:
+            st.session_state.pop("advice", None)
+            st.info(f"No students are predicted below {notes_cutoff}, so there are no notes to write.")
+        else:
+            batch = AdviceBatch(students, get_advice_store(), concurrency=int(concurrency))
+            progress = st.progress(0.0, "Generating notes...")
+            st.session_state.advice = batch.run(
+                lambda done, total: progress.progress(done / total if total else 1.0,
+                                                      f"{done:,} of {total:,} notes ready"))
+            st.session_state.advice_report = batch.report()
+
+    advice = st.session_state.get("advice")
+    if advice is not None:
+        report = st.session_state.advice_report
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Students", f"{report['students']:,}")
+        col2.metric("Generated", f"{report['generated']:,}")
+        col3.metric("Reused", f"{report['from_store']:,}")
+        col4.metric("Failed", f"{report['failed']:,}")
+        st.caption(f"{report['unique_prompts']:,} distinct prompts · {report['requests']:,} requests "
+                   f"({report['retries']:,} retried) in {report['elapsed']:.1f} s")
+        st.dataframe(advice, hide_index=True)
+        st.download_button("Download notes", advice.to_csv(index=False), "improvement_notes.csv", "text/csv")
+
+show_outbox()
 
 st.markdown("""
     <style>
@@ -293,3 +333,5 @@ st.markdown("""
 
     <a href="Ask_AI" class="floating-btn" target="_self" style="text-decoration: none; color: white;">💬 Ask AI</a>
 """, unsafe_allow_html=True)
+
+finish_rerun()
@@ -1,17 +1,81 @@
-import streamlit as st
 import pandas as pd
+import streamlit as st
 
+from utils.incremental_model import IncrementalLinearModel
+from utils.ingest import SchemaError, SessionUploads, ingest_csv, sweep_uploads
+from utils.predictor import FEATURES
+from utils.telemetry import finish_rerun, start_rerun
+from utils.training_worker import get_training_worker
+
+start_rerun("Upload Marksheet")
 st.set_page_config(page_title="Upload CSV", layout="wide")
 
 st.title("📂 Upload Your CSV File")
 
 uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
 
-if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
-    st.session_state["uploaded_df"] = df
+sweep_uploads()
+bundle = get_training_worker().current()
+uploads = st.session_state.setdefault("uploads", SessionUploads())
+batches = st.session_state.setdefault("model_batches", {})
+model = st.session_state.get("incremental_model")
+current_id = uploaded_file.file_id if uploaded_file is not None else None
+
+# Drop the store and model contribution of files that are no longer uploaded
+for file_id in uploads:
+    if file_id != current_id:
+        report = uploads.remove(file_id)
+        if st.session_state.get("uploaded_store") == report["path"]:
+            del st.session_state["uploaded_store"]
+        if file_id in batches:
+            model.merge_stats(batches.pop(file_id), sign=-1)
+
+if model is not None and not batches:
+    # No uploaded students left: back to the model every other session is served
+    st.session_state.model = bundle.get("router", bundle["result"][-1])
+    st.session_state.incremental_model = model = None
+
+if uploaded_file is not None and current_id not in uploads:
+    # Stream the upload in bounded chunks, folding labelled rows into running model stats
+    progress = st.progress(0.0, "Reading marksheet...")
+    upload_model = IncrementalLinearModel()
+
+    def fold_into_model(chunk):
+        if "Final_Score" in chunk:
+            labelled = chunk.dropna(subset=["Final_Score"])
+            upload_model.partial_fit(labelled[FEATURES], labelled["Final_Score"])
 
-    st.success("✅ File uploaded successfully! You can now check your stats!")
+    def show_progress(fraction, rows):
+        progress.progress(min(fraction or 0.0, 1.0), f"{rows:,} students read")
+
+    try:
+        uploads.add(current_id, ingest_csv(uploaded_file, on_progress=show_progress, on_chunk=fold_into_model))
+    except (SchemaError, pd.errors.ParserError) as e:
+        st.error(f"❌ {e}")
+    progress.empty()
+
+    if current_id in uploads and upload_model.n_samples_:
+        if model is None:
+            # Seeded with the served model's training rows, so predictions only move by what the upload adds
+            model = IncrementalLinearModel().merge_stats(bundle["train_stats"])
+            st.session_state.incremental_model = model
+        batches[current_id] = upload_model.stats()
+        model.merge_stats(batches[current_id])
+
+if current_id in uploads:
+    report = uploads[current_id]
+    st.session_state["uploaded_store"] = report["path"]
+
+    st.success(f"✅ File uploaded successfully! {report['rows']:,} students saved. You can now check your stats!")
+    if report["rejected"]:
+        st.warning(f"⚠️ {report['rejected']:,} rows failed validation and were skipped.")
+        st.code("\n".join(report["errors"]))
+    if report["dropped_columns"]:
+        st.info(f"Ignored unknown columns: {', '.join(report['dropped_columns'])}")
+
+    if current_id in batches:
+        st.session_state.model = model
+        st.info(f"Model updated with {batches[current_id][0]:,} uploaded students ({model.n_samples_:,} in total).")
 
 st.markdown("""
     <style>
@@ -56,3 +120,5 @@ st.markdown("""
 
     <a href="Ask_AI" class="floating-btn" target="_self" style="text-decoration: none; color: white;">💬 Ask AI</a>
 """, unsafe_allow_html=True)
+
+finish_rerun()
@@ -3,6 +3,15 @@ import requests
 import os
 from dotenv import find_dotenv, load_dotenv
 
+from utils.chat_cache import conversation_key, get_response_cache
+from utils.chat_context import ConversationContext
+from utils.groq_client import ChatStream
+from utils.roster_index import get_roster_index
+from utils.telemetry import finish_rerun, start_rerun
+from utils.training_worker import get_training_worker
+
+start_rerun("Ask AI")
+
 dotenv_path = find_dotenv()
 load_dotenv(dotenv_path)
 
@@ -11,16 +20,45 @@ st.set_page_config(page_title="Chat", layout="centered")
 # Set Groq API key
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 MODEL = "llama3-8b-8192"
+TEMPERATURE = 0.7
+CONTEXT_BUDGET = int(os.getenv("CHAT_CONTEXT_BUDGET", 3000))  # tokens per request, well under the 8192 window
+
+
+def render_message(container, role, content):
+    align = "flex-end" if role == "user" else "flex-start"
+    bg = "#3B82F6" if role == "user" else "#374151"
+    color = "white"
+    container.markdown(
+        f"""
+        <div style='display:flex; justify-content:{align};'>
+            <div style='background:{bg}; color:{color}; padding:10px; border-radius:10px; max-width:80%; margin:5px;'>
+                {content}
+            </div>
+        </div>
+        """, unsafe_allow_html=True
+    )
+
 
 def chatbot_ui():
     # Session state to store messages
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
+    if "chat_context" not in st.session_state:
+        st.session_state.chat_context = ConversationContext(budget=CONTEXT_BUDGET)
+
+    cache = get_response_cache()
 
     # Sidebar actions
     with st.sidebar:
         if st.button("🗑️ Clear chat"):
             st.session_state.chat_history = []
+            st.session_state.chat_context = ConversationContext(budget=CONTEXT_BUDGET)
+        cache_stats = cache.stats()
+        st.caption(f"Answer cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                   f"({cache_stats['hit_rate']:.0%} hit rate)")
+        context = st.session_state.chat_context
+        if context.last_tokens:
+            st.caption(f"Last request: ~{context.last_tokens:,} of {context.budget:,} tokens")
 
     # Chat container
     st.markdown("<h3 style='text-align:center;'>💬 Chat with a Bot</h3>", unsafe_allow_html=True)
@@ -28,19 +66,13 @@ def chatbot_ui():
 
     # Display chat history
     for msg in st.session_state.chat_history:
-        role, content = msg["role"], msg["content"]
-        align = "flex-end" if role == "user" else "flex-start"
-        bg = "#3B82F6" if role == "user" else "#374151"
-        color = "white"
-        chat_container.markdown(
-            f"""
-            <div style='display:flex; justify-content:{align};'>
-                <div style='background:{bg}; color:{color}; padding:10px; border-radius:10px; max-width:80%; margin:5px;'>
-                    {content}
-                </div>
-            </div>
-            """, unsafe_allow_html=True
-        )
+        render_message(chat_container, msg["role"], msg["content"])
+
+    if st.session_state.get("chat_latency") == "cached":
+        st.caption("Answered from cache")
+    elif st.session_state.get("chat_latency"):
+        ttft, elapsed = st.session_state.chat_latency
+        st.caption(f"First token in {ttft * 1000:.0f} ms · full reply in {elapsed:.1f} s")
 
     # User input
     user_input = st.chat_input("Type your message...")
@@ -48,26 +80,43 @@ def chatbot_ui():
     # Send message to Groq API
     if user_input:
         st.session_state.chat_history.append({"role": "user", "content": user_input})
+        render_message(chat_container, "user", user_input)
+
+        # Teachers get the few roster rows and stats relevant to the question, never the whole dataset
+        retrieved = []
+        if st.session_state.get("user_role") == "Teacher":
+            questions = [m["content"] for m in st.session_state.chat_history if m["role"] == "user"][-2:]
+            found = get_roster_index(get_training_worker().current()).context(" ".join(questions))
+            if found:
+                retrieved.append(found)
+
+        # Prepare messages: recent turns verbatim, older ones summarized to stay within the token budget
+        context = st.session_state.chat_context
+        messages = context.messages(st.session_state.chat_history, retrieved)
+
+        # Repeated questions are answered locally
+        key = conversation_key(MODEL, TEMPERATURE, messages)
+        cached_reply = cache.get(key)
+        if cached_reply is not None:
+            st.session_state.chat_history.append({"role": "assistant", "content": cached_reply})
+            st.session_state.chat_latency = "cached"
+            st.rerun()
+
+        # Stream the reply from Groq into the chat as tokens arrive
+        stream = ChatStream(messages, MODEL, temperature=TEMPERATURE, api_key=GROQ_API_KEY)
+        reply_box = chat_container.empty()
+        try:
+            for _ in stream:
+                render_message(reply_box, "assistant", stream.text)
+        except requests.RequestException as e:
+            st.session_state.chat_history.pop()
+            st.error(f"The assistant could not be reached: {e}")
+            return
 
-        # Prepare messages
-        messages = [{"role": msg["role"], "content": msg["content"]} for msg in st.session_state.chat_history]
-
-        # Call Groq API
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {GROQ_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": MODEL,
-                "messages": messages,
-                "temperature": 0.7
-            }
-        )
-
-        assistant_reply = response.json()["choices"][0]["message"]["content"]
-        st.session_state.chat_history.append({"role": "assistant", "content": assistant_reply})
+        cache.put(key, stream.text)
+        st.session_state.chat_history.append({"role": "assistant", "content": stream.text})
+        st.session_state.chat_latency = (stream.ttft or stream.elapsed, stream.elapsed)
         st.rerun()
 
 chatbot_ui()
+finish_rerun()
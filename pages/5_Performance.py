@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.telemetry import get_telemetry, is_admin, is_enabled
+
+st.set_page_config(page_title="Performance", layout="wide")
+
+st.title("⏱️ Performance")
+
+# Only teachers listed in PERF_ADMINS see where the time goes
+if st.session_state.get("user_role") != "Teacher" or not is_admin(st.session_state.get("teacher_email")):
+    st.error("This page is only available to administrators.")
+    st.stop()
+
+if not is_enabled():
+    st.info("Timings are not being recorded. Start the app with `PERF_TELEMETRY=1` to turn them on.")
+    st.stop()
+
+telemetry = get_telemetry()
+snapshot = telemetry.snapshot()
+st.caption(f"Recording since {datetime.fromtimestamp(snapshot['since']):%Y-%m-%d %H:%M:%S} · "
+           f"Prometheus metrics written to `{telemetry.path}` every {telemetry.interval:.0f} s")
+
+col1, col2 = st.columns(2)
+with col1:
+    st.download_button("Download metrics", telemetry.prometheus(), "metrics.prom", "text/plain")
+with col2:
+    if st.button("Reset"):
+        telemetry.reset()
+        st.rerun()
+
+# ------------------- RERUNS PER PAGE -------------------
+st.subheader("Script runs by page")
+recent = pd.DataFrame(snapshot["recent"], columns=["page", "started_at", "ms", "complete", "spans"])
+if snapshot["reruns"]:
+    reruns = pd.DataFrame(snapshot["reruns"])
+    finished = recent[recent["complete"]]
+    reruns["p95_ms"] = reruns["page"].map(
+        lambda page: np.percentile(finished.loc[finished["page"] == page, "ms"], 95)
+        if (finished["page"] == page).any() else np.nan)
+    st.dataframe(reruns[["page", "reruns", "mean_ms", "p95_ms", "max_ms"]].round(1), hide_index=True)
+    st.caption("p95 over the most recent runs; runs cut short by a login or rerun are left out.")
+else:
+    st.write("No finished runs yet.")
+
+# ------------------- SPANS -------------------
+st.subheader("Where the time goes")
+spans = pd.DataFrame(snapshot["spans"], columns=["page", "span", "calls", "total_ms", "mean_ms", "max_ms"])
+page = st.selectbox("Page", ["All pages"] + sorted(spans["page"].unique()))
+if page != "All pages":
+    spans = spans[spans["page"] == page]
+spans = spans.sort_values("total_ms", ascending=False)
+st.dataframe(spans.round(2), hide_index=True)
+if len(spans):
+    st.bar_chart(spans.groupby("span")["total_ms"].sum().sort_values(ascending=False))
+
+# ------------------- RECENT RERUNS -------------------
+st.subheader("Recent runs")
+if len(recent):
+    latest = recent.iloc[::-1].head(25)
+    st.dataframe(pd.DataFrame({
+        "At": latest["started_at"].map(lambda t: f"{datetime.fromtimestamp(t):%H:%M:%S}"),
+        "Page": latest["page"],
+        "ms": latest["ms"].round(1),
+        "Finished": latest["complete"],
+        "Slowest spans": latest["spans"].map(lambda spans: ", ".join(
+            f"{name} {ms:.0f} ms" for name, ms in sorted(spans.items(), key=lambda item: -item[1])[:3])),
+    }), hide_index=True)
+
+# ------------------- COUNTERS -------------------
+st.subheader("Counters")
+counters = pd.DataFrame(snapshot["counters"], columns=["page", "counter", "value"])
+if len(counters):
+    st.dataframe(counters.pivot_table(index="counter", columns="page", values="value", fill_value=0).astype(int),
+                 use_container_width=True)
@@ -0,0 +1,118 @@
+"""Local stand-in for the Groq chat-completions endpoint.
+
+Speaks the OpenAI-compatible API the Ask AI page uses, both as a single JSON
+response and as server-sent events when ``"stream": true``. Replies echo the
+last user message one word per chunk, as raw UTF-8 like the real service.
+With ``error_status`` set, every request fails with that status instead.
+
+    python -m stubs.groq_server --port 8787
+    GROQ_API_URL=http://localhost:8787/openai/v1/chat/completions streamlit run Dashboard.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class GroqStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), token_delay=0.01, first_token_delay=0.05, rate_limit_every=0,
+                 error_status=0, retry_after="0.05"):
+        super().__init__(address, _Handler)
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.rate_limit_every = rate_limit_every
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/openai/v1/chat/completions"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status, payload, headers=()):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        with server.lock:
+            server.requests.append(request)
+            count = len(server.requests)
+
+        if server.error_status:
+            self._json(server.error_status, {"error": {"message": "Stub failure"}})
+            return
+
+        if server.rate_limit_every and count % server.rate_limit_every == 0:
+            self._json(429, {"error": {"message": "Rate limit reached"}}, [("Retry-After", server.retry_after)])
+            return
+
+        question = next((m["content"] for m in reversed(request["messages"]) if m["role"] == "user"), "")
+        words = f"You asked: {question}".split(" ")
+        time.sleep(server.first_token_delay)
+
+        if not request.get("stream"):
+            time.sleep(server.token_delay * len(words))
+            self._json(200, {"choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)},
+                                          "finish_reason": "stop"}]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(data):
+            payload = f"data: {data}\n\n".encode()
+            self.wfile.write(f"{len(payload):X}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else " " + word}
+            send(json.dumps({"choices": [{"index": 0, "delta": delta, "finish_reason": None}]}, ensure_ascii=False))
+            time.sleep(server.token_delay)
+        send(json.dumps({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+        send("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    server = GroqStub((args.host, args.port), token_delay=args.token_delay)
+    print(f"Groq stub listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Local SMTP stand-in for exercising the email outbox without a real mail server.
+
+Accepts any AUTH PLAIN login, keeps every delivered message in memory and can
+be told to fail the first N deliveries with a temporary error, or to refuse
+some recipient addresses.
+
+    python -m stubs.smtp_server --port 2525
+    SMTP_HOST=localhost SMTP_PORT=2525 SMTP_STARTTLS=0 streamlit run Dashboard.py
+"""
+import argparse
+import socketserver
+import threading
+from email import message_from_bytes
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 0), fail_first=0, reject=()):
+        super().__init__(address, _Handler)
+        self.messages = []
+        self.connections = 0
+        self.fail_first = fail_first
+        self.reject = set(reject)
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost SMTP stub ready")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN\r\n250 SIZE 10485760\r\n")
+            elif verb == "AUTH":
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipient = command.split(":", 1)[1].strip()
+                if recipient.strip("<>") in server.reject:
+                    self.reply("550 5.1.1 No such user")
+                    continue
+                recipients.append(recipient)
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = bytearray()
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk == b".\r\n":
+                        break
+                    data += chunk[1:] if chunk.startswith(b"..") else chunk
+                with server.lock:
+                    if server.fail_first > 0:
+                        server.fail_first -= 1
+                        self.reply("451 4.3.0 Temporary failure, try again")
+                        continue
+                    server.messages.append((sender, recipients, message_from_bytes(bytes(data))))
+                self.reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--reject", action="append", default=[], help="recipient address to refuse; repeatable")
+    args = parser.parse_args()
+
+    server = SMTPStub((args.host, args.port), fail_first=args.fail_first, reject=args.reject)
+    print(f"SMTP stub listening on {args.host}:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
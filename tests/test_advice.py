@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pandas as pd
+import pytest
+
+from stubs.groq_server import GroqStub
+from utils.advice import AdviceBatch, retry_delay
+from utils.chat_cache import ResponseCache
+
+
+def students(prompts):
+    return pd.DataFrame({
+        "Student_ID": [f"S{i}" for i in range(len(prompts))],
+        "First_Name": [f"Name{i}" for i in range(len(prompts))],
+        "Predicted_Final_Score": [55.0] * len(prompts),
+        "prompt": prompts,
+    })
+
+
+def test_retry_delay_accepts_seconds_and_http_dates():
+    assert retry_delay("2.5") == 2.5
+    assert retry_delay("-1") == 0.0
+    soon = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < retry_delay(soon) <= 30
+    assert retry_delay("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_delay("soon") is None
+    assert retry_delay(None) is None
+
+
+@pytest.mark.parametrize("retry_after", ["0.01", "Wed, 21 Oct 2015 07:28:00 GMT", "garbage"])
+def test_rate_limited_requests_are_retried(tmp_path, retry_after):
+    server = GroqStub(token_delay=0, first_token_delay=0, rate_limit_every=2, retry_after=retry_after).start()
+    store = ResponseCache(path=str(tmp_path / "advice.db"))
+    try:
+        batch = AdviceBatch(students(["a", "b", "c", "a"]), store, concurrency=2, backoff=0.01, api_key="test",
+                            url=server.url)
+        results = batch.run()
+    finally:
+        server.shutdown()
+
+    report = batch.report()
+    assert report["unique_prompts"] == 3 and report["generated"] == 3 and report["failed"] == 0
+    assert report["retries"] >= 1 and report["requests"] == 3 + report["retries"]
+    assert results["Advice"].tolist() == ["You asked: a", "You asked: b", "You asked: c", "You asked: a"]
+    # Notes were written to the file and are served from it next time
+    assert ResponseCache(path=str(tmp_path / "advice.db")).get(batch._key("b")) == "You asked: b"
+
+
+def test_stored_notes_are_not_requested_again(tmp_path):
+    server = GroqStub(token_delay=0, first_token_delay=0).start()
+    store = ResponseCache(path=str(tmp_path / "advice.db"))
+    try:
+        AdviceBatch(students(["a", "b"]), store, api_key="test", url=server.url).run()
+        batch = AdviceBatch(students(["a", "b", "c"]), store, api_key="test", url=server.url)
+        batch.run()
+    finally:
+        server.shutdown()
+
+    assert batch.report()["from_store"] == 2 and batch.report()["requests"] == 1
+
+
+def test_gives_up_after_max_attempts():
+    server = GroqStub(error_status=503).start()
+    try:
+        batch = AdviceBatch(students(["a"]), ResponseCache(), max_attempts=3, backoff=0.01, api_key="test",
+                            url=server.url)
+        results = batch.run()
+    finally:
+        server.shutdown()
+
+    assert batch.report()["failed"] == 1 and batch.report()["requests"] == 3
+    assert results["Error"].tolist() == ["HTTP 503"]
+
+
+def test_no_students_is_an_empty_result():
+    calls = []
+    batch = AdviceBatch(students([]), ResponseCache(), api_key="test", url="http://127.0.0.1:9/unused")
+    results = batch.run(lambda done, total: calls.append((done, total)))
+
+    assert results.empty and list(results.columns[-2:]) == ["Advice", "Error"]
+    assert calls == [] and batch.report()["requests"] == 0
+
+
+def test_notes_are_kept_when_the_progress_callback_fails(tmp_path):
+    server = GroqStub(token_delay=0, first_token_delay=0).start()
+    store = ResponseCache(path=str(tmp_path / "advice.db"))
+    calls = []
+
+    def progress(done, total):
+        calls.append(done)
+        if len(calls) == 4:  # after the last note, so no request is cut off mid-flight
+            raise RuntimeError("page went away")
+
+    try:
+        batch = AdviceBatch(students(["a", "b", "c"]), store, concurrency=1, api_key="test", url=server.url)
+        with pytest.raises(RuntimeError):
+            batch.run(progress)
+    finally:
+        server.shutdown()
+
+    stored = [ResponseCache(path=str(tmp_path / "advice.db")).get(batch._key(prompt)) for prompt in "abc"]
+    assert stored == ["You asked: a", "You asked: b", "You asked: c"]
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import RosterAggregates
+
+
+def roster(scores):
+    n = len(scores)
+    return pd.DataFrame({
+        "Student_ID": [f"S{i}" for i in range(n)],
+        "First_Name": [f"Name{i}" for i in range(n)],
+        "Department": ["A", "B"] * (n // 2) + ["A"] * (n % 2),
+        "Midterm_Score": np.linspace(40, 90, n),
+        "Predicted_Final_Score": scores,
+    })
+
+
+def test_histogram_counts_scores_outside_the_edges():
+    aggregates = RosterAggregates.build(roster([101.2, -3.0, 55.0]))
+
+    assert aggregates.histogram.counts.sum() == aggregates.score.count == 3
+    assert aggregates.histogram.counts[0] == 1
+    assert aggregates.histogram.counts[-1] == 1
+
+
+def test_summary_matches_describe():
+    df = roster(np.random.default_rng(0).uniform(30, 100, 501))
+    summary = RosterAggregates.build(df).summary()
+
+    pd.testing.assert_frame_equal(summary, df.describe())
+    assert {"25%", "50%", "75%"} <= set(summary.index)
+
+
+def test_top_students_are_the_highest_scores_in_order():
+    scores = np.random.default_rng(1).uniform(0, 100, 1_000)
+    scores[17] = np.nan
+    df = roster(scores)
+    top = RosterAggregates.build(df).top_students(5)
+
+    expected = df.dropna().nlargest(5, "Predicted_Final_Score")
+    assert top["Student_ID"].tolist() == expected["Student_ID"].tolist()
+    assert top["First_Name"].tolist() == expected["First_Name"].tolist()
+    assert top["Predicted_Final_Score"].tolist() == expected["Predicted_Final_Score"].round(2).tolist()
+
+
+def test_group_summary():
+    df = roster([50.0, 70.0, 60.0, 80.0])
+    groups = RosterAggregates.build(df).group_summary()
+
+    assert groups["Department"].tolist() == ["A", "B"]
+    assert groups["Mean Score"].tolist() == [55.0, 75.0]
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from utils.charts import thin_scatter
+
+
+def test_thin_scatter_keeps_extent_when_cells_exceed_budget():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"x": rng.uniform(0, 100, 200_000), "y": rng.uniform(0, 100, 200_000)})
+    sample = thin_scatter(df, "x", "y", max_points=5_000)
+
+    assert len(sample) == 5_000
+    for column in ("x", "y"):
+        assert sample[column].min() == df[column].min()
+        assert sample[column].max() == df[column].max()
+    # Kept cells are spread over the whole cloud, not just the low-x columns
+    assert (sample["x"] > 50).mean() > 0.4
+
+
+def test_thin_scatter_keeps_sparse_outliers():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({"x": rng.normal(50, 1, 50_000), "y": rng.normal(50, 1, 50_000)})
+    df.loc[123, ["x", "y"]] = [500, -500]
+    sample = thin_scatter(df, "x", "y", max_points=1_000)
+
+    assert len(sample) == 1_000
+    assert 123 in sample.index
+    assert sample.index.is_monotonic_increasing
+
+
+def test_thin_scatter_returns_small_frames_unchanged():
+    df = pd.DataFrame({"x": [1.0, 2.0], "y": [3.0, 4.0]})
+    assert thin_scatter(df, "x", "y") is df
@@ -0,0 +1,57 @@
+import threading
+
+from utils.chat_cache import ResponseCache, conversation_key
+
+
+def test_key_ignores_case_and_whitespace():
+    first = conversation_key("m", 0.7, [{"role": "user", "content": "How do I  improve?"}])
+    second = conversation_key("m", 0.7, [{"role": "user", "content": " how do i improve? "}])
+    assert first == second
+    assert first != conversation_key("m", 0.2, [{"role": "user", "content": "How do I improve?"}])
+
+
+def test_replies_survive_in_the_file(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResponseCache(path=path).put_many([("a", "one"), ("b", "two")])
+
+    cache = ResponseCache(path=path)
+    assert cache.get("a") == "one" and cache.get("b") == "two" and cache.get("c") is None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_expired_replies_are_misses(tmp_path):
+    cache = ResponseCache(ttl=-1, path=str(tmp_path / "cache.db"))
+    cache.put("a", "one")
+    assert cache.get("a") is None
+
+
+def test_file_is_read_without_holding_the_lock(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResponseCache(path=path).put("a", "one")
+    cache = ResponseCache(path=path)
+    held = []
+    connect = cache._connect
+
+    def checked_connect():
+        held.append(cache._lock.locked())
+        return connect()
+
+    cache._connect = checked_connect
+    assert cache.get("a") == "one"
+    assert held == [False]
+
+
+def test_concurrent_threads_share_the_file(tmp_path):
+    cache = ResponseCache(maxsize=1, path=str(tmp_path / "cache.db"))
+    cache.put_many([(str(i), f"reply {i}") for i in range(50)])
+    results = {}
+
+    def read(i):
+        results[i] = cache.get(str(i))
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {i: f"reply {i}" for i in range(50)}
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error, r2_score
+
+from utils import chunked_training
+from utils.chunked_training import KEY_COLUMN, TARGET, ChunkedTrainer
+from utils.predictor import FEATURES
+from utils.training_worker import DATASET_PATH
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 33, 64, 1000])
+def test_chunked_fit_matches_the_in_memory_fit(chunk_rows):
+    df = pd.read_csv(DATASET_PATH).dropna(subset=FEATURES + [TARGET])
+    # Imported through the module: pytest would collect a bare ``test_mask`` as a test
+    test = chunked_training.test_mask(df[KEY_COLUMN])
+    expected = LinearRegression().fit(df.loc[~test, FEATURES], df.loc[~test, TARGET])
+    predicted = expected.predict(df.loc[test, FEATURES])
+
+    trainer = ChunkedTrainer(DATASET_PATH, chunk_rows=chunk_rows)
+    model = trainer.fit()
+
+    assert trainer.chunks == -(-trainer.rows // chunk_rows)
+    assert model.n_samples_ == (~test).sum() and trainer.test.n_samples_ == test.sum()
+    np.testing.assert_allclose(model.coef_, expected.coef_, rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(model.intercept_, expected.intercept_, rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(trainer.r2, r2_score(df.loc[test, TARGET], predicted), rtol=1e-6)
+    np.testing.assert_allclose(trainer.rmse, np.sqrt(mean_squared_error(df.loc[test, TARGET], predicted)),
+                               rtol=1e-6)
@@ -0,0 +1,44 @@
+import pytest
+import requests
+
+from stubs.groq_server import GroqStub
+from utils.groq_client import ChatStream
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server = GroqStub(token_delay=0, first_token_delay=0).start()
+    yield server
+    server.shutdown()
+
+
+def chat(url, question):
+    return ChatStream([{"role": "user", "content": question}], model="stub", api_key="test", url=url)
+
+
+def test_streams_tokens_until_done(stub):
+    stream = chat(stub.url, "how am I doing")
+    tokens = list(stream)
+
+    assert tokens == ["You", " asked:", " how", " am", " I", " doing"]
+    assert stream.text == "You asked: how am I doing"
+    assert stream.ttft is not None and stream.elapsed >= stream.ttft
+    assert stub.requests[-1]["stream"] is True
+
+
+def test_decodes_non_ascii_tokens_as_utf8(stub):
+    stream = chat(stub.url, "Café — naïve ✓")
+    list(stream)
+
+    assert stream.text == "You asked: Café — naïve ✓"
+
+
+@pytest.mark.parametrize("status", [401, 429, 500])
+def test_error_status_raises(status):
+    server = GroqStub(error_status=status).start()
+    try:
+        with pytest.raises(requests.HTTPError) as error:
+            list(chat(server.url, "hello"))
+        assert error.value.response.status_code == status
+    finally:
+        server.shutdown()
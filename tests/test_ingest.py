@@ -0,0 +1,43 @@
+import gc
+import io
+import os
+
+import pytest
+
+from utils.ingest import SchemaError, SessionUploads, ingest_csv
+
+HEADER = "Student_ID,Midterm_Score,Assignments_Avg,Quizzes_Avg,Project_Score,Attendance,Study_Hours_per_Week," \
+         "Sleep_Hours,Final_Score\n"
+
+
+def marksheet(rows):
+    return io.BytesIO((HEADER + "".join(f"S{i},60,70,65,80,90,10,7,72\n" for i in range(rows))).encode())
+
+
+def test_empty_file_is_a_schema_error(tmp_path):
+    dest = tmp_path / "upload.parquet"
+    with pytest.raises(SchemaError, match="empty"):
+        ingest_csv(io.BytesIO(b""), dest_path=str(dest))
+    assert not dest.exists()
+
+
+def test_header_only_file_is_a_schema_error(tmp_path):
+    with pytest.raises(SchemaError, match="no data rows"):
+        ingest_csv(io.BytesIO(HEADER.encode()), dest_path=str(tmp_path / "upload.parquet"))
+
+
+def test_session_uploads_delete_their_stores(tmp_path):
+    uploads = SessionUploads()
+    first = ingest_csv(marksheet(3), dest_path=str(tmp_path / "first.parquet"))
+    second = ingest_csv(marksheet(5), dest_path=str(tmp_path / "second.parquet"))
+    uploads.add("a", first)
+    uploads.add("b", second)
+    assert list(uploads) == ["a", "b"] and uploads["b"]["rows"] == 5
+
+    uploads.remove("a")
+    assert not os.path.exists(first["path"]) and os.path.exists(second["path"])
+
+    # A session that ends takes its remaining stores with it
+    del uploads
+    gc.collect()
+    assert not os.path.exists(second["path"])
@@ -0,0 +1,113 @@
+import pytest
+
+from stubs.smtp_server import SMTPStub
+from utils.outbox import EmailOutbox
+
+
+@pytest.fixture
+def stub():
+    server = SMTPStub().start()
+    yield server
+    server.shutdown()
+
+
+def outbox_for(stub, **kwargs):
+    options = {"username": "teacher@example.com", "password": "secret", "starttls": False, "workers": 1,
+               "backoff": 0.01, "idle_timeout": 1}
+    options.update(kwargs)
+    return EmailOutbox(host="127.0.0.1", port=stub.port, **options)
+
+
+def test_batch_is_sent_over_one_connection(stub):
+    outbox = outbox_for(stub, batch_size=50)
+    job_ids = outbox.enqueue_many([(f"s{i}@example.com", "Alert", f"Hello {i}") for i in range(30)])
+
+    assert outbox.wait(job_ids, timeout=10)
+    assert [status["status"] for status in outbox.statuses(job_ids)] == ["sent"] * 30
+    assert len(stub.messages) == 30
+    assert stub.connections == outbox.connections_opened == 1
+    sender, recipients, message = stub.messages[0]
+    assert message["From"] == "teacher@example.com"
+    outbox.stop()
+
+
+def test_temporary_failures_are_retried(stub):
+    stub.fail_first = 2
+    outbox = outbox_for(stub)
+    job_id = outbox.enqueue("s@example.com", "Alert", "Hello")
+
+    assert outbox.wait([job_id], timeout=10)
+    status = outbox.status(job_id)
+    assert status["status"] == "sent" and status["attempts"] == 3
+    assert len(stub.messages) == 1
+    outbox.stop()
+
+
+def test_gives_up_after_max_attempts(stub):
+    stub.fail_first = 10
+    outbox = outbox_for(stub, max_attempts=2)
+    job_id = outbox.enqueue("s@example.com", "Alert", "Hello")
+
+    assert outbox.wait([job_id], timeout=10)
+    status = outbox.status(job_id)
+    assert status["status"] == "failed" and status["attempts"] == 2 and "451" in status["error"]
+    assert stub.messages == []
+    outbox.stop()
+
+
+def test_duplicates_are_sent_once(stub):
+    outbox = outbox_for(stub)
+    first = outbox.enqueue("s@example.com", "Alert", "Hello")
+    assert outbox.wait([first], timeout=10)
+
+    assert outbox.enqueue("s@example.com", "Alert", "Hello") == first
+    assert outbox.enqueue("s@example.com", "Alert", "Hello again") != first
+    assert outbox.status(first)["status"] == "sent"
+    outbox.stop()
+
+
+def test_finished_jobs_expire(stub):
+    outbox = outbox_for(stub, job_ttl=0)
+    first = outbox.enqueue("s@example.com", "Alert", "Hello")
+    assert outbox.wait([first], timeout=10)
+
+    # The next enqueue forgets the sent job, so the same message is no longer a duplicate
+    second = outbox.enqueue("s@example.com", "Alert", "Hello")
+    assert second != first
+    assert outbox.status(first) is None
+    assert outbox.wait([second], timeout=10)
+    assert len(stub.messages) == 2
+    outbox.stop()
+
+
+def test_missing_sender_fails_without_connecting(stub):
+    outbox = outbox_for(stub, username=None, password=None)
+    job_id = outbox.enqueue("s@example.com", "Alert", "Hello")
+
+    status = outbox.status(job_id)
+    assert status["status"] == "failed" and "sender" in status["error"]
+    assert stub.connections == 0
+
+
+def test_sender_can_differ_from_login(stub):
+    outbox = outbox_for(stub, sender="alerts@example.com")
+    job_id = outbox.enqueue("s@example.com", "Alert", "Hello")
+
+    assert outbox.wait([job_id], timeout=10)
+    assert stub.messages[0][2]["From"] == "alerts@example.com"
+    outbox.stop()
+
+
+def test_refused_recipient_fails_alone_and_keeps_the_connection(stub):
+    stub.reject = {"gone@example.com"}
+    outbox = outbox_for(stub, batch_size=50)
+    job_ids = outbox.enqueue_many([("a@example.com", "Alert", "Hello"), ("gone@example.com", "Alert", "Hello"),
+                                   ("b@example.com", "Alert", "Hello")])
+
+    assert outbox.wait(job_ids, timeout=10)
+    statuses = outbox.statuses(job_ids)
+    assert [status["status"] for status in statuses] == ["sent", "failed", "sent"]
+    assert statuses[1]["attempts"] == 1 and "550" in statuses[1]["error"]
+    assert len(stub.messages) == 2
+    assert stub.connections == outbox.connections_opened == 1
+    outbox.stop()
@@ -0,0 +1,25 @@
+from utils.roster_index import RetrievalIndex
+
+
+def test_search_skips_documents_retired_during_the_search():
+    index = RetrievalIndex()
+    index.update({"a": "Alice scored 91 in Science", "b": "Bob scored 62 in Arts"})
+    transform = index.vectorizer.transform
+
+    def transform_after_update(texts):
+        # Another session's swap lands between taking the matrix and reading the texts
+        index.vectorizer.transform = transform
+        index.update({"b": "Bob scored 62 in Arts"})
+        return transform(texts)
+
+    index.vectorizer.transform = transform_after_update
+    assert index.search("Alice Science") == []
+    assert [key for key, _, _ in index.search("Bob Arts")] == ["b"]
+
+
+def test_search_returns_the_matching_texts():
+    index = RetrievalIndex()
+    index.update({"a": "Alice scored 91 in Science", "b": "Bob scored 62 in Arts"})
+    (key, text, score), = index.search("Alice", k=5)
+    assert (key, text) == ("a", "Alice scored 91 in Science")
+    assert score > 0
@@ -0,0 +1,74 @@
+import os
+import shutil
+
+import pytest
+
+from utils import dataset_store, training_worker
+from utils.training_worker import TrainingWorker
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "STORE_DIR", str(tmp_path / "store"))
+    dataset = tmp_path / "roster.csv"
+    shutil.copy(training_worker.DATASET_PATH, dataset)
+    return TrainingWorker(dataset_path=str(dataset), artifact_dir=str(tmp_path / "models"))
+
+
+def test_failed_fit_is_retried_without_the_file_changing(worker, monkeypatch):
+    worker._refresh()
+    assert worker.current(timeout=0)["version"] == 1
+
+    with open(worker.dataset_path) as f:
+        header, first, *rest = f.read().splitlines()
+    with open(worker.dataset_path, "w") as f:
+        f.write("\n".join([header, *rest]) + "\n")
+
+    def failing_fit(df):
+        raise RuntimeError("fit failed")
+
+    fit = training_worker.MODEL_CACHE.get_or_fit
+    monkeypatch.setattr(training_worker.MODEL_CACHE, "get_or_fit", failing_fit)
+    with pytest.raises(RuntimeError):
+        worker._refresh()
+    assert worker.current(timeout=0)["version"] == 1
+
+    monkeypatch.setattr(training_worker.MODEL_CACHE, "get_or_fit", fit)
+    worker._refresh()
+    assert worker.current(timeout=0)["version"] == 2
+
+
+def test_touched_but_unchanged_file_is_not_refitted(worker):
+    worker._refresh()
+    stat = os.stat(worker.dataset_path)
+    os.utime(worker.dataset_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    worker._refresh()
+
+    assert worker.current(timeout=0)["version"] == 1
+    assert worker._dataset_stat == (stat.st_mtime_ns + 10 ** 9, stat.st_size)
+
+
+def test_changed_shard_key_refits_the_served_artifact(worker):
+    worker._refresh()
+    plain = worker.current(timeout=0)
+    assert "router" not in plain
+
+    sharded = TrainingWorker(dataset_path=worker.dataset_path, artifact_dir=worker.artifact_dir,
+                             shard_key="Department")
+    sharded._load_latest()
+    assert sharded.current(timeout=0)["model_key"] == plain["model_key"]
+    sharded._refresh()
+
+    bundle = sharded.current(timeout=0)
+    assert bundle["version"] == 2
+    assert "router" in bundle
+    assert bundle["fingerprint"] == plain["fingerprint"]
+    assert bundle["model_key"] != plain["model_key"]
+
+    # A restart with the same settings serves the sharded artifact and does not refit
+    restarted = TrainingWorker(dataset_path=worker.dataset_path, artifact_dir=worker.artifact_dir,
+                               shard_key="Department")
+    restarted._load_latest()
+    restarted._refresh()
+    assert restarted.current(timeout=0)["version"] == 2
+    assert "router" in restarted.current(timeout=0)
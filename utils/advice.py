@@ -0,0 +1,209 @@
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+import pandas as pd
+
+from utils.campaign import ALERT_CUTOFF, reason_text
+from utils.chat_cache import ResponseCache, conversation_key
+from utils.groq_client import CONNECT_TIMEOUT, GROQ_API_URL, READ_TIMEOUT
+from utils.scoring import THRESHOLDS, score_roster
+from utils.telemetry import count, observe, timed
+
+ADVICE_MODEL = "llama3-8b-8192"
+ADVICE_TEMPERATURE = 0.3
+ADVICE_PATH = os.path.join("data", "advice.db")
+
+# No names or IDs: students with the same profile share one prompt, and one request
+ADVICE_PROMPT = """Write a short, encouraging improvement note for a student, as 3 to 5 concrete bullet points.
+Their predicted final score is {score:.0f}, below the target of {cutoff}.
+Areas below expectations:
+{reasons}
+Attendance: {attendance:.0f}%. Study hours per week: {study:.1f}. Sleep hours: {sleep:.1f}."""
+
+
+@timed("advice.select")
+def at_risk_students(roster, model, cutoff=ALERT_CUTOFF, thresholds=THRESHOLDS):
+    """Students predicted below ``cutoff``, with the prompt for their improvement note."""
+    scores = score_roster(roster, model, risk_levels=(cutoff,), thresholds=thresholds)
+    flagged = scores[f"Below_{cutoff}"].to_numpy()
+    students = roster[flagged]
+    predicted = scores["Predicted_Final_Score"].to_numpy()[flagged]
+    reasons = reason_text(students, scores["Reason_Mask"].to_numpy()[flagged], thresholds)
+
+    prompts = [
+        ADVICE_PROMPT.format(score=score, cutoff=cutoff, reasons=text or "none of the tracked scores",
+                             attendance=attendance, study=study, sleep=sleep)
+        for score, text, attendance, study, sleep in zip(
+            predicted.round().tolist(), reasons.tolist(), students["Attendance"].tolist(),
+            students["Study_Hours_per_Week"].tolist(), students["Sleep_Hours"].tolist())
+    ]
+    return pd.DataFrame({
+        "Student_ID": students["Student_ID"].to_numpy(),
+        "First_Name": students["First_Name"].to_numpy() if "First_Name" in students else students["Student_ID"].to_numpy(),
+        "Predicted_Final_Score": predicted.round(2),
+        "prompt": prompts,
+    })
+
+
+def retry_delay(value):
+    """Seconds to wait from a ``Retry-After`` header, in delta-seconds or HTTP-date form; None if unusable."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdviceBatch:
+    """Generates one improvement note per student with concurrent requests.
+
+    Identical prompts are sent once, notes already in ``store`` are not
+    requested again, at most ``concurrency`` requests are in flight, and 429s,
+    5xx responses and connection errors are retried with exponential backoff
+    (honouring ``Retry-After``).
+    """
+
+    def __init__(self, students, store, concurrency=8, max_attempts=5, backoff=1.0,
+                 model=ADVICE_MODEL, temperature=ADVICE_TEMPERATURE, api_key=None, url=None,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        self.students = students
+        self.store = store
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.model = model
+        self.temperature = temperature
+        self.api_key = api_key if api_key is not None else os.getenv("GROQ_API_KEY")
+        self.url = url or os.getenv("GROQ_API_URL", GROQ_API_URL)
+        self.timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.notes = {}
+        self.errors = {}
+        self.unique = 0
+        self.stored = 0
+        self.requested = 0
+        self.retries = 0
+        self.elapsed = 0.0
+
+    def _messages(self, prompt):
+        return [{"role": "user", "content": prompt}]
+
+    def _key(self, prompt):
+        return conversation_key(self.model, self.temperature, self._messages(prompt))
+
+    async def _complete(self, client, semaphore, prompt):
+        payload = {"model": self.model, "messages": self._messages(prompt), "temperature": self.temperature}
+        async with semaphore:
+            for attempt in range(1, self.max_attempts + 1):
+                delay = None
+                try:
+                    self.requested += 1
+                    sent = time.perf_counter()
+                    response = await client.post(self.url, json=payload)
+                    observe("groq.advice", time.perf_counter() - sent)
+                    if response.status_code == 429 or response.status_code >= 500:
+                        delay = retry_delay(response.headers.get("Retry-After"))
+                        error = f"HTTP {response.status_code}"
+                    else:
+                        response.raise_for_status()
+                        return response.json()["choices"][0]["message"]["content"]
+                except httpx.TransportError as e:
+                    error = repr(e)
+                if attempt == self.max_attempts:
+                    raise RuntimeError(error)
+                self.retries += 1
+                count("groq.retry")
+                # Backing off while holding the slot also eases pressure on a rate-limited API
+                await asyncio.sleep(delay if delay is not None else self.backoff * 2 ** (attempt - 1))
+
+    async def _run(self, prompts, on_progress):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(headers=headers, timeout=self.timeout, limits=limits) as client:
+
+            async def generate(prompt):
+                try:
+                    self.notes[prompt] = await self._complete(client, semaphore, prompt)
+                except Exception as e:
+                    self.errors[prompt] = str(e)
+                if on_progress:
+                    on_progress(len(self.notes) + len(self.errors), self.unique)
+
+            await asyncio.gather(*(generate(prompt) for prompt in prompts))
+
+    def run(self, on_progress=None):
+        """Fill in every note; returns the students with ``Advice`` and ``Error`` columns."""
+        started = time.perf_counter()
+        prompts = list(dict.fromkeys(self.students["prompt"].tolist()))
+        self.unique = len(prompts)
+        if not prompts:
+            return self.results()
+        pending = []
+        for prompt in prompts:
+            note = self.store.get(self._key(prompt))
+            if note is None:
+                pending.append(prompt)
+            else:
+                self.notes[prompt] = note
+        self.stored = len(self.notes)
+        if on_progress:
+            on_progress(self.stored, self.unique)
+        if pending:
+            try:
+                asyncio.run(self._run(pending, on_progress))
+            finally:
+                # One transaction once the requests are done (blocking SQLite writes would stall the event
+                # loop); also when a progress callback raised, so the notes already generated are kept
+                self.store.put_many([(self._key(prompt), self.notes[prompt]) for prompt in pending
+                                     if prompt in self.notes])
+        self.elapsed = time.perf_counter() - started
+        return self.results()
+
+    def results(self):
+        prompts = self.students["prompt"]
+        results = self.students.drop(columns="prompt")
+        results["Advice"] = prompts.map(self.notes)
+        results["Error"] = prompts.map(self.errors)
+        return results
+
+    def report(self):
+        return {
+            "students": len(self.students),
+            "unique_prompts": self.unique,
+            "from_store": self.stored,
+            "generated": len(self.notes) - self.stored,
+            "failed": len(self.errors),
+            "requests": self.requested,
+            "retries": self.retries,
+            "elapsed": self.elapsed,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_advice_store():
+    """Process-wide store of generated notes, kept in a SQLite file (ADVICE_PATH) across restarts."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResponseCache(
+                maxsize=int(os.getenv("ADVICE_CACHE_SIZE", 4096)),
+                ttl=float(os.getenv("ADVICE_TTL", 30 * 24 * 3600)),
+                path=os.getenv("ADVICE_PATH", ADVICE_PATH),
+            )
+    return _store
@@ -0,0 +1,144 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.telemetry import timed
+
+SCORE_COLUMN = "Predicted_Final_Score"
+SCORE_EDGES = np.linspace(0, 100, 11)
+TOP_K = 10  # the Dashboard shows 3 and the retrieval index 5
+
+
+class RunningStats:
+    """Count, mean, variance and bounds of a column, mergeable batch by batch."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        n_b = len(values)
+        if n_b == 0:
+            return
+        mean_b = values.mean()
+        total = self.count + n_b
+        delta = mean_b - self.mean
+        self.m2 += ((values - mean_b) ** 2).sum() + delta ** 2 * self.count * n_b / total
+        self.mean += delta * n_b / total
+        self.count = total
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+
+    @property
+    def std(self):
+        return float(np.sqrt(max(self.m2, 0.0) / (self.count - 1))) if self.count > 1 else np.nan
+
+
+class FixedHistogram:
+    """Counts over fixed ``edges``; values outside them land in the end bins, so every student is counted."""
+
+    def __init__(self, edges=SCORE_EDGES):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = np.clip(values[~np.isnan(values)], self.edges[0], self.edges[-1])
+        counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+
+
+class RosterAggregates:
+    """Dashboard numbers for a scored roster, materialized once per served model.
+
+    ``build`` makes one pass over the roster when the training worker swaps a
+    bundle in; every read afterwards is O(1) or O(k), whatever the roster size.
+    There is no incremental update: a new model rescores every student, and
+    uploads never change the served roster. The rebuild runs on the training
+    worker's thread after the refit, and costs about as much as the fit does.
+    """
+
+    def __init__(self, k=TOP_K, score_column=SCORE_COLUMN, group_column="Department"):
+        self.k = k
+        self.score_column = score_column
+        self.group_column = group_column
+        self.score = RunningStats()
+        self.histogram = FixedHistogram()
+        self.groups = {}
+        self._top = pd.DataFrame(columns=["Student_ID", "First_Name", score_column])
+        self._summary = pd.DataFrame()
+
+    @classmethod
+    @timed("aggregates.build")
+    def build(cls, roster, **kwargs):
+        aggregates = cls(**kwargs)
+        scores = roster[aggregates.score_column].to_numpy(dtype=np.float64)
+        aggregates.score.add(scores)
+        aggregates.histogram.add(scores)
+        aggregates._summary = roster.describe()
+
+        if aggregates.group_column in roster:
+            for group, rows in roster.groupby(aggregates.group_column, observed=True)[aggregates.score_column]:
+                aggregates.groups.setdefault(group, RunningStats()).add(rows)
+
+        # argpartition finds the k highest in one pass instead of sorting the roster
+        ranked = np.where(np.isnan(scores), -np.inf, scores)
+        best = np.argpartition(-ranked, aggregates.k)[:aggregates.k] if len(scores) > aggregates.k \
+            else np.arange(len(scores))
+        best = best[np.argsort(-ranked[best], kind="stable")]
+        top = roster.iloc[best]
+        aggregates._top = pd.DataFrame({
+            "Student_ID": top["Student_ID"].to_numpy(),
+            "First_Name": top["First_Name"].to_numpy() if "First_Name" in top else None,
+            aggregates.score_column: scores[best].round(2),
+        })
+        return aggregates
+
+    def top_students(self, k=None):
+        return self._top.head(k or self.k).reset_index(drop=True)
+
+    def histogram_frame(self):
+        edges = self.histogram.edges
+        return pd.DataFrame({
+            "Score": (edges[:-1] + edges[1:]) / 2,
+            "Width": np.diff(edges),
+            "Students": self.histogram.counts.copy(),
+        })
+
+    def summary(self):
+        """``describe()`` table of every numeric column."""
+        return self._summary.copy()
+
+    def group_summary(self):
+        return pd.DataFrame(
+            [(group, s.count, s.mean, s.std) for group, s in self.groups.items()],
+            columns=[self.group_column, "Students", "Mean Score", "Std"],
+        ).sort_values(self.group_column, ignore_index=True)
+
+
+_aggregates = {}
+_aggregates_lock = threading.Lock()
+
+
+def build_aggregates(bundle):
+    """Training-worker hook: materialize the aggregates for a newly served roster."""
+    aggregates = RosterAggregates.build(bundle["roster"])
+    with _aggregates_lock:
+        _aggregates.clear()
+        _aggregates[bundle["model_key"]] = aggregates
+
+
+def get_roster_aggregates(bundle):
+    with _aggregates_lock:
+        aggregates = _aggregates.get(bundle["model_key"])
+    if aggregates is None:
+        build_aggregates(bundle)
+        with _aggregates_lock:
+            aggregates = _aggregates[bundle["model_key"]]
+    return aggregates
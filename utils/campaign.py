@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.scoring import THRESHOLDS, score_roster
+
+ALERT_SUBJECT = "Academic Performance Alert"
+ALERT_CUTOFF = 70
+
+ALERT_TEMPLATE = """
+    Hi {name},
+
+    We noticed that your predicted final score is below {cutoff}. Based on our analysis, the following factors may be contributing to this:
+
+    - {reasons}
+
+    We recommend addressing these areas to improve your performance.
+
+    Best,
+    Model Minds Team
+    """
+
+
+def alert_body(name, reasons, cutoff=ALERT_CUTOFF):
+    return ALERT_TEMPLATE.format(name=name, reasons="\n".join(reasons), cutoff=cutoff)
+
+
+def reason_text(roster, reason_mask, thresholds=THRESHOLDS):
+    """Newline-joined reasons per student, built column by column rather than row by row."""
+    text = pd.Series("", index=roster.index, dtype=object)
+    for bit, (column, threshold) in enumerate(thresholds.items()):
+        below = (reason_mask & (1 << bit)) != 0
+        if not below.any():
+            continue
+        reason = (f"{column.replace('_', ' ')} is " + roster[column].astype(str)
+                  + f", which is below the threshold of {threshold}")
+        separator = np.where(text != "", "\n", "")
+        text = text.where(~below, text + separator + reason)
+    return text
+
+
+def at_risk_messages(roster, model, cutoff=ALERT_CUTOFF, thresholds=THRESHOLDS, email_column="Email_ID"):
+    """Personalized alerts for every student predicted below ``cutoff`` with at least one reason.
+
+    Returns ``(messages, skipped)``: a frame of Student_ID/to/body, and the
+    number of flagged students that have no email address.
+    """
+    scores = score_roster(roster, model, risk_levels=(cutoff,), thresholds=thresholds)
+    flagged = scores[f"Below_{cutoff}"].to_numpy() & (scores["Reason_Mask"].to_numpy() != 0)
+    students = roster[flagged]
+    mask = scores["Reason_Mask"].to_numpy()[flagged]
+
+    emails = students[email_column] if email_column in students else pd.Series(None, index=students.index)
+    has_email = emails.notna().to_numpy() & (emails.astype(str).str.strip() != "").to_numpy()
+    students, mask, emails = students[has_email], mask[has_email], emails[has_email]
+
+    reasons = reason_text(students, mask, thresholds)
+    names = students["First_Name"] if "First_Name" in students else students["Student_ID"]
+    bodies = [ALERT_TEMPLATE.format(name=name, reasons=text, cutoff=cutoff)
+              for name, text in zip(names.tolist(), reasons.tolist())]
+    messages = pd.DataFrame({"Student_ID": students["Student_ID"].to_numpy(), "to": emails.to_numpy(),
+                             "body": bodies})
+    return messages, int((~has_email).sum())
+
+
+def parquet_at_risk_messages(path, model, cutoff=ALERT_CUTOFF, batch_rows=100_000, **kwargs):
+    """Same as :func:`at_risk_messages`, reading an uploaded store in bounded batches."""
+    parts, skipped = [], 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+        messages, missing = at_risk_messages(batch.to_pandas(), model, cutoff, **kwargs)
+        parts.append(messages)
+        skipped += missing
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["Student_ID", "to", "body"]), skipped
+
+
+class Campaign:
+    """Delivers one alert per student through the outbox and tracks progress."""
+
+    def __init__(self, messages, outbox, subject=ALERT_SUBJECT, skipped=0):
+        self.outbox = outbox
+        self.skipped = skipped
+        self.started = time.monotonic()
+        self.finished = None
+        self.job_ids = outbox.enqueue_many(
+            (to, subject, body) for to, body in zip(messages["to"].tolist(), messages["body"].tolist()))
+
+    def report(self):
+        statuses = self.outbox.statuses(self.job_ids)
+        counts = pd.Series([status["status"] for status in statuses], dtype=object).value_counts()
+        sent = int(counts.get("sent", 0))
+        failed = int(counts.get("failed", 0))
+        if sent + failed == len(self.job_ids) and self.finished is None:
+            self.finished = time.monotonic()
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "total": len(self.job_ids),
+            "sent": sent,
+            "failed": failed,
+            "pending": len(self.job_ids) - sent - failed,
+            "skipped": self.skipped,
+            "elapsed": elapsed,
+            "per_second": sent / elapsed if elapsed > 0 else 0.0,
+            "failures": [status for status in statuses if status["status"] == "failed"],
+        }
@@ -0,0 +1,217 @@
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.telemetry import count, timed
+
+PAIRPLOT_BINS = 30
+MAX_BINNED_ROWS = 1_000_000
+MAX_SCATTER_ROWS = 2_000
+CHUNK_ROWS = 200_000
+
+_images = OrderedDict()
+_images_lock = threading.Lock()
+MAX_CACHED_IMAGES = 16
+
+
+def stratified_sample(df, n, by="Department", seed=0):
+    """At most ``n`` rows, keeping each group's share of the roster."""
+    if len(df) <= n:
+        return df
+    if by not in df:
+        return df.sample(n, random_state=seed)
+    return df.groupby(by, observed=True, group_keys=False).sample(frac=n / len(df), random_state=seed)
+
+
+def pairwise_histograms(values, bins=PAIRPLOT_BINS):
+    """2D counts for every column pair, from a single pass over the rows.
+
+    Each column is quantized to ``bins`` codes once; the codes of all i <= j
+    pairs are then counted together with one ``bincount`` per chunk of rows,
+    and the lower triangle is filled by transposing. Returns ``(counts, edges)``
+    with ``counts[i, j]`` binned on columns i and j.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n, d = values.shape
+    low = np.nanmin(values, axis=0)
+    high = np.nanmax(values, axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    edges = low[:, None] + span[:, None] * np.linspace(0, 1, bins + 1)[None, :]
+
+    rows, cols = np.triu_indices(d)
+    pair_offsets = np.arange(len(rows)) * bins * bins
+    flat = np.zeros(len(rows) * bins * bins, dtype=np.int64)
+    for start in range(0, n, CHUNK_ROWS):
+        chunk = values[start:start + CHUNK_ROWS]
+        chunk = chunk[~np.isnan(chunk).any(axis=1)]
+        codes = np.clip(((chunk - low) / span * bins).astype(np.int64), 0, bins - 1)
+        pair_codes = pair_offsets + codes[:, rows] * bins + codes[:, cols]
+        flat += np.bincount(pair_codes.ravel(), minlength=flat.size)
+
+    counts = np.zeros((d, d, bins, bins), dtype=np.int64)
+    counts[rows, cols] = flat.reshape(len(rows), bins, bins)
+    counts[cols, rows] = counts[rows, cols].transpose(0, 2, 1)
+    return counts, edges
+
+
+def _png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=80, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+@timed("chart.pairplot")
+def density_pairplot(df, columns, bins=PAIRPLOT_BINS):
+    from matplotlib.colors import LogNorm
+    from matplotlib.figure import Figure
+
+    values = stratified_sample(df, MAX_BINNED_ROWS)[columns].to_numpy(dtype=np.float64)
+    counts, edges = pairwise_histograms(values, bins)
+    d = len(columns)
+
+    fig = Figure(figsize=(1.8 * d, 1.8 * d))
+    axes = fig.subplots(d, d, squeeze=False)
+    for i in range(d):
+        for j in range(d):
+            ax = axes[i, j]
+            if i == j:
+                ax.stairs(counts[i, i].diagonal(), edges[i], fill=True)
+            else:
+                # Rows are column i (y axis), columns are column j (x axis)
+                grid = counts[i, j]
+                ax.imshow(np.ma.masked_equal(grid, 0), origin="lower", aspect="auto", cmap="viridis",
+                          norm=LogNorm(vmin=1, vmax=max(grid.max(), 1)),
+                          extent=(edges[j][0], edges[j][-1], edges[i][0], edges[i][-1]))
+            if i == d - 1:
+                ax.set_xlabel(columns[j], fontsize=8)
+            if j == 0:
+                ax.set_ylabel(columns[i], fontsize=8)
+            ax.tick_params(labelsize=6)
+    return _png(fig)
+
+
+@timed("chart.pairplot")
+def scatter_pairplot(df, columns):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    grid = sns.pairplot(stratified_sample(df, MAX_SCATTER_ROWS)[columns], plot_kws={"s": 8})
+    try:
+        return _png(grid.figure)
+    finally:
+        plt.close(grid.figure)
+
+
+def cached_pairplot(df, columns, version, mode="density"):
+    """PNG of the pairplot, rendered once per dataset version, columns and mode."""
+    key = (version, tuple(columns), mode)
+    with _images_lock:
+        if key in _images:
+            _images.move_to_end(key)
+            count("chart.pairplot_reused")
+            return _images[key]
+
+    if mode == "density":
+        image = density_pairplot(df, list(columns))
+    else:
+        image = scatter_pairplot(df, list(columns))
+
+    with _images_lock:
+        _images[key] = image
+        while len(_images) > MAX_CACHED_IMAGES:
+            _images.popitem(last=False)
+    return image
+
+
+# ------------------- BROWSER PAYLOAD REDUCTION -------------------
+MAX_SCATTER_POINTS = 5_000
+MAX_BOX_POINTS = 5_000
+SCATTER_GRID = 100
+
+
+def thin_scatter(df, x, y, max_points=MAX_SCATTER_POINTS, grid=SCATTER_GRID, seed=0):
+    """Downsample to ``max_points`` rows while keeping the shape of the cloud.
+
+    Every occupied cell of a ``grid`` x ``grid`` raster keeps at least one point
+    (a random subset of the cells when there are more than ``max_points``) and
+    the rows holding the minimum and maximum of ``x`` and ``y`` always stay, so
+    the extent, sparse regions and outliers survive; the rest of the budget is
+    a uniform sample, which preserves relative density.
+    """
+    if len(df) <= max_points:
+        return df
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(df))
+    xs = df[x].to_numpy(dtype=np.float64)[order]
+    ys = df[y].to_numpy(dtype=np.float64)[order]
+
+    def cell(values):
+        low, high = np.nanmin(values), np.nanmax(values)
+        span = high - low if high > low else 1.0
+        return np.clip(((values - low) / span * grid).astype(np.int64), 0, grid - 1)
+
+    _, first = np.unique(cell(xs) * grid + cell(ys), return_index=True)
+    # The extreme rows always stay; the other cells are taken in random order, since np.unique sorts
+    # them by cell code and truncating that would drop the high-x side of the cloud
+    edges = np.unique([np.nanargmin(xs), np.nanargmax(xs), np.nanargmin(ys), np.nanargmax(ys)])
+    cells = rng.permutation(np.setdiff1d(first, edges, assume_unique=True))
+    keep = order[np.concatenate([edges, cells[:max_points - len(edges)]])]
+    remaining = max_points - len(keep)
+    if remaining > 0:
+        rest = np.setdiff1d(order, keep, assume_unique=True)
+        keep = np.concatenate([keep, rng.choice(rest, remaining, replace=False)])
+    return df.iloc[np.sort(keep)]
+
+
+@timed("chart.scatter")
+def scatter_figure(df, x, y, color=None, title=None):
+    import plotly.express as px
+
+    sample = thin_scatter(df, x, y)
+    if len(sample) < len(df):
+        title = f"{title} ({len(sample):,} of {len(df):,} students shown)"
+    return px.scatter(sample, x=x, y=y, color=color, title=title, render_mode="webgl")
+
+
+def box_stats(df, group, value):
+    """Quartiles and Tukey whiskers per group, plus the rows outside the whiskers."""
+    data = df[[group, value]].dropna()
+    grouped = data.groupby(group, observed=True)[value]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q1", "median", "q3"]
+    iqr = stats["q3"] - stats["q1"]
+    stats["low_fence"] = stats["q1"] - 1.5 * iqr
+    stats["high_fence"] = stats["q3"] + 1.5 * iqr
+
+    low = data[group].map(stats["low_fence"]).astype(np.float64)
+    high = data[group].map(stats["high_fence"]).astype(np.float64)
+    inside = (data[value] >= low) & (data[value] <= high)
+    whiskers = data[inside].groupby(group, observed=True)[value].agg(["min", "max"])
+    stats["lower"] = whiskers["min"]
+    stats["upper"] = whiskers["max"]
+    stats["count"] = grouped.size()
+    return stats.drop(columns=["low_fence", "high_fence"]), data[~inside]
+
+
+@timed("chart.box")
+def box_figure(df, group, value, title=None):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    if len(df) <= MAX_BOX_POINTS:
+        return px.box(df, x=group, y=value, points="all", title=title)
+
+    # Ship six numbers per group instead of every row
+    stats, outliers = box_stats(df, group, value)
+    fig = go.Figure(go.Box(
+        x=stats.index.astype(str), q1=stats["q1"], median=stats["median"], q3=stats["q3"],
+        lowerfence=stats["lower"], upperfence=stats["upper"], name=value, boxpoints=False,
+    ))
+    if len(outliers):
+        outliers = outliers.sample(min(len(outliers), MAX_BOX_POINTS), random_state=0)
+        fig.add_trace(go.Scattergl(x=outliers[group].astype(str), y=outliers[value], mode="markers",
+                                   marker={"size": 4}, name="Outliers"))
+    fig.update_layout(title=title, xaxis_title=group, yaxis_title=value, showlegend=False)
+    return fig
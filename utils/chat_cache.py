@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def conversation_key(model, temperature, messages):
+    """Hash of a request, ignoring case and whitespace differences in the messages."""
+    normalized = [
+        {"role": message["role"], "content": " ".join(message["content"].split()).casefold()}
+        for message in messages
+    ]
+    payload = json.dumps({"model": model, "temperature": temperature, "messages": normalized},
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """TTL + LRU cache of chat replies, optionally backed by a SQLite file.
+
+    The in-memory LRU is bounded by ``maxsize``; with ``path`` set, replies also
+    survive restarts and are shared with other processes using the same file.
+    The lock only guards the LRU: each thread reads and writes the file over
+    its own connection, so sessions never queue behind each other's I/O.
+    """
+
+    def __init__(self, maxsize=512, ttl=24 * 3600, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with self._connect() as conn:
+                # Readers are not blocked while another thread or process writes
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS replies (key TEXT PRIMARY KEY, reply TEXT, expires REAL)")
+                conn.execute("DELETE FROM replies WHERE expires < ?", (time.time(),))
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Closed when its thread ends and the thread-local goes with it
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+        return conn
+
+    def _remember(self, key, reply, expires):
+        self._entries[key] = (expires, reply)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if not self.path:
+                self.misses += 1
+                return None
+
+        row = self._connect().execute("SELECT expires, reply FROM replies WHERE key = ? AND expires >= ?",
+                                      (key, now)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, row[1], row[0])
+            self.hits += 1
+            return row[1]
+
+    def put(self, key, reply):
+        self.put_many([(key, reply)])
+
+    def put_many(self, items):
+        """Store ``(key, reply)`` pairs, in a single transaction when backed by a file."""
+        expires = time.time() + self.ttl
+        rows = [(key, reply, expires) for key, reply in items]
+        if not rows:
+            return
+        with self._lock:
+            for key, reply, _ in rows:
+                self._remember(key, reply, expires)
+        if self.path:
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO replies (key, reply, expires) VALUES (?, ?, ?)", rows)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide cache; set CHAT_CACHE_PATH to persist replies on disk."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                maxsize=int(os.getenv("CHAT_CACHE_SIZE", 512)),
+                ttl=float(os.getenv("CHAT_CACHE_TTL", 24 * 3600)),
+                path=os.getenv("CHAT_CACHE_PATH") or None,
+            )
+    return _cache
@@ -0,0 +1,73 @@
+from collections import deque
+
+MESSAGE_OVERHEAD = 4
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English text; no tokenizer download needed
+    return len(text) // 4 + 1
+
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+class ConversationContext:
+    """Keeps each chat request under a token budget.
+
+    The newest turns are sent verbatim; turns that fall out of that window are
+    folded, once each, into a short extractive summary that is itself capped
+    at ``summary_budget`` tokens. Work per turn depends only on the new
+    messages, and the request size stays flat however long the chat runs.
+    """
+
+    def __init__(self, budget=3000, summary_budget=400, snippet_chars=160):
+        self.budget = budget
+        self.summary_budget = min(summary_budget, budget // 3)
+        self.snippet_chars = snippet_chars
+        self.summary_lines = deque()
+        self.summary_tokens = 0
+        self.summarized = 0
+        self.last_tokens = 0
+
+    def _fold(self, message):
+        text = " ".join(message["content"].split())
+        if len(text) > self.snippet_chars:
+            text = text[:self.snippet_chars].rsplit(" ", 1)[0] + "…"
+        line = f"- {'User' if message['role'] == 'user' else 'Assistant'}: {text}"
+        self.summary_lines.append(line)
+        self.summary_tokens += estimate_tokens(line)
+        while self.summary_tokens > self.summary_budget and len(self.summary_lines) > 1:
+            self.summary_tokens -= estimate_tokens(self.summary_lines.popleft())
+
+    def messages(self, history, context=()):
+        """Messages to send for ``history``, newest turns verbatim and older ones summarized.
+
+        ``context`` messages (e.g. retrieved data) go first and their tokens come
+        out of the verbatim window.
+        """
+        reserved = sum(message_tokens(m) for m in context)
+        available = self.budget - reserved - self.summary_budget - estimate_tokens(SUMMARY_HEADER) - MESSAGE_OVERHEAD
+        start, used = len(history), 0
+        while start > self.summarized and used + message_tokens(history[start - 1]) <= available:
+            start -= 1
+            used += message_tokens(history[start])
+        # The latest message always goes out, trimmed if it alone exceeds the budget
+        start = min(start, len(history) - 1)
+
+        for message in history[self.summarized:start]:
+            self._fold(message)
+        self.summarized = max(self.summarized, start)
+
+        recent = [{"role": m["role"], "content": m["content"]} for m in history[start:]]
+        if used == 0 and recent:
+            limit = max(available, 1) * 4
+            recent[-1]["content"] = recent[-1]["content"][-limit:]
+
+        messages = list(context)
+        if self.summary_lines:
+            messages.append({"role": "system", "content": "\n".join([SUMMARY_HEADER, *self.summary_lines])})
+        messages.extend(recent)
+        self.last_tokens = sum(message_tokens(m) for m in messages)
+        return messages
@@ -0,0 +1,131 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.incremental_model import IncrementalLinearModel, batch_stats
+from utils.predictor import FEATURES
+from utils.telemetry import timed
+
+TARGET = "Final_Score"
+KEY_COLUMN = "Student_ID"
+CHUNK_ROWS = 200_000
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
+SPLIT_BUCKETS = 10_000
+
+
+def iter_chunks(source, columns, chunk_rows=CHUNK_ROWS):
+    """DataFrames of at most ``chunk_rows`` rows holding only ``columns``, from a CSV, Parquet or Arrow file."""
+    ext = os.path.splitext(str(source))[1].lower()
+    if ext == ".parquet":
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    elif ext in (".arrow", ".feather"):
+        # Read rather than memory-mapped, so pages already trained on do not stay resident
+        with pa.OSFile(str(source)) as f:
+            reader = pa.ipc.open_file(f)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(columns)
+                for offset in range(0, batch.num_rows, chunk_rows):
+                    yield batch.slice(offset, chunk_rows).to_pandas()
+    else:
+        yield from pd.read_csv(source, usecols=columns, chunksize=chunk_rows)
+
+
+def test_mask(keys, test_size=TEST_SIZE, seed=SPLIT_SEED):
+    """True for the rows in the test split.
+
+    Decided by a seeded hash of each key, so a student lands on the same side
+    of the split however the file is chunked or ordered.
+    """
+    hashes = pd.util.hash_pandas_object(pd.Series(keys), index=False, hash_key=f"{seed:016d}"[-16:]).to_numpy()
+    return hashes % SPLIT_BUCKETS < round(test_size * SPLIT_BUCKETS)
+
+
+def regression_metrics(stats, coef, intercept):
+    """R² and RMSE of a linear model over the rows summarised by ``stats``, as returned by ``batch_stats``.
+
+    The squared residuals are a quadratic form of the rows' mean and scatter
+    matrix, so test rows never need to be kept or scored one by one.
+    """
+    n, mean, scatter = stats
+    if n == 0:
+        return np.nan, np.nan
+    weights = np.append(-np.asarray(coef, dtype=np.float64), 1.0)  # residual = weights . [x, y] - intercept
+    mean_residual = mean @ weights - intercept
+    sse = max(weights @ scatter @ weights + n * mean_residual ** 2, 0.0)
+    sst = scatter[-1, -1]
+    return float(1 - sse / sst) if sst else np.nan, float(np.sqrt(sse / n))
+
+
+class ChunkedTrainer:
+    """Fits the linear model in one streaming pass over a file that need not fit in memory.
+
+    Each chunk is split by ``test_mask`` on ``key`` (row position when None);
+    training rows are folded into an ``IncrementalLinearModel`` and test rows
+    into running statistics that R² and RMSE are computed from at the end. At
+    most one chunk of the feature columns is held at a time. Rows with missing
+    values are skipped. The result matches ``LinearRegression`` and sklearn's
+    metrics on the same split.
+    """
+
+    def __init__(self, source, features=FEATURES, target=TARGET, key=KEY_COLUMN, test_size=TEST_SIZE,
+                 seed=SPLIT_SEED, chunk_rows=CHUNK_ROWS):
+        self.source = source
+        self.features = list(features)
+        self.target = target
+        self.key = key
+        self.test_size = test_size
+        self.seed = seed
+        self.chunk_rows = chunk_rows
+        self.model = IncrementalLinearModel(self.features)
+        # Running statistics of the test rows; a second model only to reuse its merge, never solved
+        self.test = IncrementalLinearModel(self.features)
+        self.rows = 0
+        self.skipped = 0
+        self.chunks = 0
+        self.r2 = None
+        self.rmse = None
+        self.elapsed = 0.0
+
+    @timed("model.fit_chunked")
+    def fit(self, on_progress=None):
+        """Stream the whole source; returns the fitted model. ``on_progress(rows)`` is called after each chunk."""
+        started = time.perf_counter()
+        columns = self.features + [self.target] + ([self.key] if self.key else [])
+        for chunk in iter_chunks(self.source, columns, self.chunk_rows):
+            keys = chunk[self.key] if self.key else np.arange(self.rows, self.rows + len(chunk))
+            self.rows += len(chunk)
+            self.chunks += 1
+
+            values = chunk[self.features + [self.target]].to_numpy(dtype=np.float64)
+            complete = ~np.isnan(values).any(axis=1)
+            self.skipped += int((~complete).sum())
+            test = test_mask(keys, self.test_size, self.seed)
+
+            train_rows = values[complete & ~test]
+            self.model.merge_stats(batch_stats(train_rows[:, :-1], train_rows[:, -1]))
+            test_rows = values[complete & test]
+            self.test.merge_stats(batch_stats(test_rows[:, :-1], test_rows[:, -1]))
+            if on_progress:
+                on_progress(self.rows)
+
+        self.r2, self.rmse = regression_metrics(self.test.stats(), self.model.coef_, self.model.intercept_)
+        self.elapsed = time.perf_counter() - started
+        return self.model
+
+    def report(self):
+        return {
+            "rows": self.rows,
+            "train_rows": self.model.n_samples_,
+            "test_rows": self.test.n_samples_,
+            "skipped": self.skipped,
+            "chunks": self.chunks,
+            "r2": self.r2,
+            "rmse": self.rmse,
+            "elapsed": self.elapsed,
+        }
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from utils.telemetry import count, span, timed
+
+DATASET_PATH = "Student Performance Sample.csv"
+STORE_DIR = "data"
+CATEGORICAL_COLUMNS = ["Gender", "Department", "Internet_Access"]
+
+_frames = {}
+_lock = threading.Lock()
+
+
+def store_path(csv_path):
+    name = os.path.splitext(os.path.basename(csv_path))[0].replace(" ", "_").lower()
+    return os.path.join(STORE_DIR, f"{name}.arrow")
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {b"source_mtime_ns": str(stat.st_mtime_ns).encode(), b"source_size": str(stat.st_size).encode()}
+
+
+@timed("data.build_store")
+def build_store(csv_path=DATASET_PATH, path=None):
+    """Convert the CSV once into an uncompressed Arrow file that can be memory-mapped."""
+    path = path or store_path(csv_path)
+    df = pd.read_csv(csv_path)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype("category")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, **_source_stamp(csv_path)})
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+
+def _is_fresh(path, csv_path):
+    if not os.path.exists(path):
+        return False
+    with pa.memory_map(path) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    stamp = _source_stamp(csv_path)
+    return all(metadata.get(key) == value for key, value in stamp.items())
+
+
+def open_table(csv_path=DATASET_PATH):
+    """Memory-mapped Arrow table for the dataset, rebuilding the store if the CSV changed."""
+    path = store_path(csv_path)
+    if not _is_fresh(path, csv_path):
+        build_store(csv_path, path)
+    return feather.read_table(path, memory_map=True)
+
+
+def load_frame(csv_path=DATASET_PATH):
+    """Read-only DataFrame shared by every session in the process.
+
+    Converted from the memory-mapped store once per store version; callers
+    must copy before mutating it.
+    """
+    path = store_path(csv_path)
+    with _lock:
+        stamp = _source_stamp(csv_path)
+        cached = _frames.get(path)
+        if cached is not None and cached[0] == stamp:
+            count("data.frame_reused")
+            return cached[1]
+        with span("data.load"):
+            df = open_table(csv_path).to_pandas(split_blocks=True)
+        _frames[path] = (stamp, df)
+        return df
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.telemetry import observe
+
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 30
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Keep-alive HTTP session shared by every chat turn and user in the process."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+    return _session
+
+
+class ChatStream:
+    """Iterates over reply tokens as they arrive and records latency.
+
+    After iteration ``text`` holds the full reply, ``ttft`` the time to first
+    token and ``elapsed`` the total time, both in seconds.
+    """
+
+    def __init__(self, messages, model, temperature=0.7, api_key=None, url=None,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        self.payload = {"model": model, "messages": messages, "temperature": temperature, "stream": True}
+        self.api_key = api_key if api_key is not None else os.getenv("GROQ_API_KEY")
+        self.url = url or os.getenv("GROQ_API_URL", GROQ_API_URL)
+        self.timeout = timeout
+        self.text = ""
+        self.ttft = None
+        self.elapsed = None
+
+    def __iter__(self):
+        started = time.perf_counter()
+        response = get_session().post(
+            self.url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json=self.payload,
+            stream=True,
+            timeout=self.timeout,
+        )
+        with response:
+            response.raise_for_status()
+            # Raw bytes, decoded here: a bare text/event-stream response would otherwise be read as ISO-8859-1
+            for line in response.iter_lines():
+                line = line.decode("utf-8")
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                token = json.loads(data)["choices"][0]["delta"].get("content")
+                if token:
+                    if self.ttft is None:
+                        self.ttft = time.perf_counter() - started
+                    self.text += token
+                    yield token
+        self.elapsed = time.perf_counter() - started
+        # Recorded here rather than around the loop, which also times the caller rendering each token
+        observe("groq.chat", self.elapsed)
+        if self.ttft is not None:
+            observe("groq.first_token", self.ttft)
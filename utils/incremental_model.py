@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from utils.predictor import FEATURES
+
+
+def batch_stats(X, y):
+    """Sufficient statistics ``(n, mean, scatter)`` of a batch, over the joint [X, y] columns."""
+    Z = np.column_stack([np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+    n = len(Z)
+    if n == 0:
+        return 0, np.zeros(Z.shape[1]), np.zeros((Z.shape[1], Z.shape[1]))
+    mean = Z.mean(axis=0)
+    centered = Z - mean
+    return n, mean, centered.T @ centered
+
+
+class IncrementalLinearModel:
+    """Least-squares regression that can add or retract batches of students.
+
+    Keeps the count, means and centred scatter matrix of [X, y], so updates cost
+    O(batch * d^2) and solving costs O(d^3) regardless of how many students have
+    been seen. Fits match ``LinearRegression`` on the same rows.
+    """
+
+    def __init__(self, features=FEATURES):
+        self.features = list(features)
+        d = len(self.features) + 1
+        self.n_samples_ = 0
+        self._mean = np.zeros(d)
+        self._scatter = np.zeros((d, d))
+        self._solution = None
+
+    def _as_array(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.features]
+        return np.asarray(X, dtype=np.float64)
+
+    def merge_stats(self, stats, sign=1):
+        n_b, mean_b, scatter_b = stats
+        if n_b == 0:
+            return self
+        n = self.n_samples_
+        if sign > 0:
+            total = n + n_b
+            delta = mean_b - self._mean
+            self._mean = self._mean + delta * (n_b / total)
+            self._scatter = self._scatter + scatter_b + np.outer(delta, delta) * (n * n_b / total)
+        else:
+            total = n - n_b
+            if total < 0:
+                raise ValueError("Cannot retract more students than the model has seen")
+            if total == 0:
+                self._mean = np.zeros_like(self._mean)
+                self._scatter = np.zeros_like(self._scatter)
+            else:
+                self._mean = (n * self._mean - n_b * mean_b) / total
+                delta = mean_b - self._mean
+                self._scatter = self._scatter - scatter_b - np.outer(delta, delta) * (total * n_b / n)
+        self.n_samples_ = total
+        self._solution = None
+        return self
+
+    def stats(self):
+        """Current ``(n, mean, scatter)``, in the same form as :func:`batch_stats`."""
+        return self.n_samples_, self._mean.copy(), self._scatter.copy()
+
+    def partial_fit(self, X, y):
+        """Add a batch of students; returns its stats so it can be retracted later."""
+        stats = batch_stats(self._as_array(X), y)
+        self.merge_stats(stats)
+        return stats
+
+    def retract(self, X, y):
+        stats = batch_stats(self._as_array(X), y)
+        self.merge_stats(stats, sign=-1)
+        return stats
+
+    def fit(self, X, y):
+        self.__init__(self.features)
+        self.partial_fit(X, y)
+        return self
+
+    def _solve(self):
+        if self._solution is None:
+            if self.n_samples_ == 0:
+                raise ValueError("Model has not seen any students yet")
+            d = len(self.features)
+            coef = np.linalg.lstsq(self._scatter[:d, :d], self._scatter[:d, d], rcond=None)[0]
+            intercept = self._mean[d] - self._mean[:d] @ coef
+            self._solution = coef, intercept
+        return self._solution
+
+    @property
+    def coef_(self):
+        return self._solve()[0]
+
+    @property
+    def intercept_(self):
+        return self._solve()[1]
+
+    def predict(self, X):
+        coef, intercept = self._solve()
+        return self._as_array(X) @ coef + intercept
@@ -0,0 +1,188 @@
+import os
+import tempfile
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.predictor import FEATURES
+from utils.telemetry import timed
+
+UPLOAD_DIR = os.path.join("data", "uploads")
+CHUNK_ROWS = 50_000
+MAX_ERRORS = 20
+
+REQUIRED_COLUMNS = ["Student_ID"] + FEATURES
+TEXT_COLUMNS = ["Student_ID", "First_Name", "Email_ID"]
+CATEGORICAL_COLUMNS = ["Gender", "Department", "Internet_Access"]
+VALUE_RANGES = {
+    "Midterm_Score": (0, 100),
+    "Assignments_Avg": (0, 100),
+    "Quizzes_Avg": (0, 100),
+    "Project_Score": (0, 100),
+    "Attendance": (0, 100),
+    "Study_Hours_per_Week": (0, 168),
+    "Sleep_Hours": (0, 24),
+    "Final_Score": (0, 100),
+}
+
+ARROW_TYPES = {
+    **{column: pa.string() for column in TEXT_COLUMNS},
+    **{column: pa.dictionary(pa.int32(), pa.string()) for column in CATEGORICAL_COLUMNS},
+    **{column: pa.float32() for column in VALUE_RANGES},
+}
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _validate_chunk(chunk, first_line, errors):
+    """Coerce and downcast one chunk; returns the valid rows and the rejected count."""
+    valid = chunk["Student_ID"].notna() & (chunk["Student_ID"].str.strip() != "")
+
+    for column, (low, high) in VALUE_RANGES.items():
+        if column not in chunk:
+            continue
+        values = pd.to_numeric(chunk[column], errors="coerce")
+        bad = values.isna() | (values < low) | (values > high)
+        if column not in REQUIRED_COLUMNS:
+            # Optional columns may be blank, but not out of range
+            bad &= chunk[column].notna()
+        if len(errors) < MAX_ERRORS and bad.any():
+            for position in np.flatnonzero(bad.to_numpy())[:MAX_ERRORS - len(errors)]:
+                errors.append(f"line {first_line + position}: {column}={chunk[column].iloc[position]!r} "
+                              f"is not a number in [{low}, {high}]")
+        valid &= ~bad
+        chunk[column] = values.astype(np.float32)
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in chunk:
+            chunk[column] = chunk[column].astype("category")
+
+    rejected = int((~valid).sum())
+    return chunk[valid.to_numpy()], rejected
+
+
+@timed("data.ingest")
+def ingest_csv(source, dest_path=None, chunk_rows=CHUNK_ROWS, on_progress=None, on_chunk=None):
+    """Stream a marksheet CSV into a Parquet store, one bounded chunk at a time.
+
+    ``on_progress(fraction, rows)`` is called after every chunk and
+    ``on_chunk(df)`` receives each validated chunk, so callers can fold rows
+    into running statistics without ever holding the whole file.
+    """
+    total_bytes = getattr(source, "size", None)
+    if total_bytes is None and isinstance(source, (str, os.PathLike)):
+        total_bytes = os.path.getsize(source)
+
+    if dest_path is None:
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        fd, dest_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".parquet")
+        os.close(fd)
+
+    report = {"path": dest_path, "rows": 0, "rejected": 0, "errors": [], "dropped_columns": []}
+    writer = None
+    line = 2  # line 1 is the header
+    try:
+        try:
+            reader = pd.read_csv(source, chunksize=chunk_rows, dtype=str, skipinitialspace=True)
+        except pd.errors.EmptyDataError:
+            raise SchemaError("The file is empty") from None
+        for chunk in reader:
+            if writer is None:
+                missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+                if missing:
+                    raise SchemaError(f"Missing required columns: {', '.join(missing)}")
+                columns = [column for column in chunk.columns if column in ARROW_TYPES]
+                report["dropped_columns"] = [column for column in chunk.columns if column not in ARROW_TYPES]
+                schema = pa.schema([(column, ARROW_TYPES[column]) for column in columns])
+                writer = pq.ParquetWriter(dest_path, schema, compression="zstd")
+
+            rows_read = len(chunk)
+            chunk, rejected = _validate_chunk(chunk[columns], line, report["errors"])
+            line += rows_read
+            report["rejected"] += rejected
+
+            if len(chunk):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                report["rows"] += len(chunk)
+                if on_chunk is not None:
+                    on_chunk(chunk)
+
+            if on_progress is not None:
+                fraction = source.tell() / total_bytes if total_bytes and hasattr(source, "tell") else None
+                on_progress(fraction, report["rows"])
+        if writer is None or report["rows"] + report["rejected"] == 0:
+            raise SchemaError("The file has no data rows")
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+    writer.close()
+    return report
+
+
+def _remove_files(paths):
+    for path in list(paths):
+        if os.path.exists(path):
+            os.remove(path)
+    paths.clear()
+
+
+class SessionUploads:
+    """One session's ingested files by upload id.
+
+    The Parquet store of each is deleted when it is removed, and any still
+    left when the session is dropped (this object is garbage collected).
+    """
+
+    def __init__(self):
+        self._reports = {}
+        self._paths = set()
+        weakref.finalize(self, _remove_files, self._paths)
+
+    def __contains__(self, file_id):
+        return file_id in self._reports
+
+    def __iter__(self):
+        return iter(list(self._reports))
+
+    def __getitem__(self, file_id):
+        return self._reports[file_id]
+
+    def add(self, file_id, report):
+        self._reports[file_id] = report
+        self._paths.add(report["path"])
+
+    def remove(self, file_id):
+        report = self._reports.pop(file_id)
+        self._paths.discard(report["path"])
+        _remove_files([report["path"]])
+        return report
+
+
+_STARTED = time.time()
+_swept = False
+_sweep_lock = threading.Lock()
+
+
+def sweep_uploads(upload_dir=UPLOAD_DIR):
+    """Delete stores left by an earlier run of the app, whose sessions cannot have survived it; once per process."""
+    global _swept
+    with _sweep_lock:
+        if _swept:
+            return
+        _swept = True
+    if not os.path.isdir(upload_dir):
+        return
+    for entry in os.scandir(upload_dir):
+        if entry.is_file() and entry.stat().st_mtime < _STARTED:
+            os.remove(entry.path)
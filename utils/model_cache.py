@@ -0,0 +1,86 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.predictor import FEATURES, predict
+from utils.telemetry import count
+
+
+def dataset_fingerprint(df, features=FEATURES):
+    """Content hash of the dataset plus the feature list used to train on it."""
+    h = hashlib.sha256()
+    h.update("|".join(map(str, df.columns)).encode())
+    h.update(b"\0")
+    h.update("|".join(features).encode())
+    h.update(b"\0")
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+class ModelCache:
+    """Thread-safe LRU of trained models shared by every session in the process.
+
+    Concurrent misses on the same fingerprint wait for a single fit instead of
+    each training their own copy.
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get_or_fit(self, df, features=FEATURES, fit=predict):
+        key = dataset_fingerprint(df, features)
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    count("model_cache.hit")
+                    return self._entries[key]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    count("model_cache.miss")
+                    break
+            # Another session is already fitting this dataset
+            pending.wait()
+
+        try:
+            result = fit(df, features)
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+        return result
+
+    def invalidate(self, fingerprint=None):
+        with self._lock:
+            if fingerprint is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(fingerprint, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+MODEL_CACHE = ModelCache()
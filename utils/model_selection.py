@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.predictor import FEATURES
+from utils.process_pool import worker_pool
+from utils.telemetry import count, span
+
+TARGET = "Final_Score"
+CANDIDATES = ("Linear", "Ridge", "Random forest", "Gradient boosting")
+FOLDS = 5
+CV_SEED = 42
+SAMPLE_ROWS = 500_000  # larger rosters are evaluated on a seeded sample; the tree ensembles would take hours
+
+# Set in each worker process by _load_folds, so the roster is sent once per worker rather than once per fold
+_X = None
+_y = None
+_splits = None
+
+
+def make_model(name, seed=CV_SEED):
+    """Unfitted regressor for a name in ``CANDIDATES``."""
+    # sklearn is only imported by the worker processes
+    if name == "Linear":
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression()
+    if name == "Ridge":
+        from sklearn.linear_model import Ridge
+        return Ridge(alpha=1.0)
+    if name == "Random forest":
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(n_estimators=100, min_samples_leaf=5, random_state=seed, n_jobs=1)
+    if name == "Gradient boosting":
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        return HistGradientBoostingRegressor(random_state=seed)
+    raise ValueError(f"Unknown model: {name}")
+
+
+def _load_folds(X, y, folds, seed):
+    global _X, _y, _splits
+    from sklearn.model_selection import KFold
+
+    _X, _y = X, y
+    _splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X))
+
+
+def fit_fold(name, fold, seed=CV_SEED):
+    """Fit ``name`` on every fold but ``fold`` and score it on ``fold``; runs in a worker process."""
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    train, test = _splits[fold]
+    model = make_model(name, seed)
+    started = time.perf_counter()
+    model.fit(_X[train], _y[train])
+    fitted = time.perf_counter()
+    predicted = model.predict(_X[test])
+    scored = time.perf_counter()
+    return {
+        "model": name,
+        "fold": fold,
+        "r2": float(r2_score(_y[test], predicted)),
+        "rmse": float(np.sqrt(mean_squared_error(_y[test], predicted))),
+        "fit_s": fitted - started,
+        "predict_s": scored - fitted,
+        "train_rows": len(train),
+    }
+
+
+class CrossValidation:
+    """k-fold cross-validation of every candidate on one dataset version, in background worker processes.
+
+    Each (model, fold) pair is one task; results land in ``results`` as they
+    finish, so the page can show partial progress. Pairs already in
+    ``cached`` are not refitted.
+    """
+
+    def __init__(self, df, fingerprint, candidates=CANDIDATES, folds=FOLDS, seed=CV_SEED, workers=None,
+                 sample_rows=SAMPLE_ROWS, cached=None):
+        self.fingerprint = fingerprint
+        self.candidates = list(candidates)
+        self.folds = folds
+        self.seed = seed
+        self.rows = len(df)
+        self.sample_rows = sample_rows
+        self.results = dict(cached or {})
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._df = df
+        self._tasks = [(name, fold) for name in self.candidates for fold in range(folds)
+                       if (name, fold) not in self.results]
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self._tasks)))
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self.started = time.monotonic()
+                self._thread = threading.Thread(target=self._run, name="cross-validation", daemon=True)
+                self._thread.start()
+        return self
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    def _run(self):
+        try:
+            if self._tasks:
+                with span("model.cross_validate"):
+                    self._evaluate()
+        except Exception as e:
+            self.error = repr(e)
+        finally:
+            self._df = None
+            self.finished = time.monotonic()
+
+    def _evaluate(self):
+        data = self._df[FEATURES + [TARGET]].dropna()
+        if len(data) > self.sample_rows:
+            data = data.sample(self.sample_rows, random_state=self.seed)
+        X = data[FEATURES].to_numpy(dtype=np.float64)
+        y = data[TARGET].to_numpy(dtype=np.float64)
+        # Out of process even with one worker: the tree ensembles would otherwise hold the GIL that every
+        # Streamlit session shares. A pool of its own, so the roster is sent once per worker, not per fold.
+        with worker_pool(self.workers, initializer=_load_folds, initargs=(X, y, self.folds, self.seed)) as pool:
+            futures = [pool.submit(fit_fold, name, fold, self.seed) for name, fold in self._tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                with self._lock:
+                    self.results[(result["model"], result["fold"])] = result
+                count("model.cv_fold")
+
+    def report(self):
+        with self._lock:
+            finished = len(self.results)
+        end = self.finished or time.monotonic()
+        return {
+            "total": len(self.candidates) * self.folds,
+            "finished": finished,
+            "running": self.started is not None and not self.done,
+            "error": self.error,
+            "elapsed": end - self.started if self.started else 0.0,
+            "rows": min(self.rows, self.sample_rows),
+            "sampled": self.rows > self.sample_rows,
+            "workers": self.workers,
+        }
+
+    def fold_results(self):
+        with self._lock:
+            results = list(self.results.values())
+        return pd.DataFrame(results, columns=["model", "fold", "r2", "rmse", "fit_s", "predict_s", "train_rows"])
+
+    def summary(self):
+        """One row per candidate: folds done, mean and stdev of R² and RMSE, and fit/predict time per fold."""
+        folds = self.fold_results()
+        summary = folds.groupby("model", sort=False).agg(
+            Folds=("fold", "size"),
+            R2_mean=("r2", "mean"), R2_std=("r2", "std"),
+            RMSE_mean=("rmse", "mean"), RMSE_std=("rmse", "std"),
+            Fit_s=("fit_s", "mean"), Predict_s=("predict_s", "mean"),
+        ).reindex([name for name in self.candidates if name in set(folds["model"])])
+        summary = summary.sort_values("RMSE_mean").reset_index()
+        return summary.rename(columns={"model": "Model", "R2_mean": "R² mean", "R2_std": "R² stdev",
+                                       "RMSE_mean": "RMSE mean", "RMSE_std": "RMSE stdev",
+                                       "Fit_s": "Fit s / fold", "Predict_s": "Predict s / fold"})
+
+
+class ModelEvaluator:
+    """Cross-validation runs of the last ``maxsize`` dataset versions, keyed by fingerprint.
+
+    Asking again for a version already evaluated (or being evaluated) returns
+    the same run; a run that failed is restarted, keeping the folds it finished.
+    """
+
+    def __init__(self, maxsize=4, workers=None):
+        self.maxsize = maxsize
+        self.workers = workers
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        with self._lock:
+            return self._runs.get(fingerprint)
+
+    def evaluate(self, df, fingerprint, **kwargs):
+        with self._lock:
+            run = self._runs.get(fingerprint)
+            if run is None or (run.done and run.error):
+                run = CrossValidation(df, fingerprint, workers=self.workers,
+                                      cached=run.results if run is not None else None, **kwargs)
+                self._runs[fingerprint] = run
+            self._runs.move_to_end(fingerprint)
+            while len(self._runs) > self.maxsize:
+                self._runs.popitem(last=False)
+        return run.start()
+
+
+_evaluator = None
+_evaluator_lock = threading.Lock()
+
+
+def get_model_evaluator():
+    """Process-wide evaluator; MODEL_CV_WORKERS caps its worker processes (default: one per CPU)."""
+    global _evaluator
+    with _evaluator_lock:
+        if _evaluator is None:
+            _evaluator = ModelEvaluator(workers=int(os.getenv("MODEL_CV_WORKERS", 0)) or None)
+    return _evaluator
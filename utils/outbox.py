@@ -0,0 +1,242 @@
+import hashlib
+import heapq
+import itertools
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+
+from utils.telemetry import count, span
+
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 587
+JOB_TTL = 24 * 3600
+
+
+class EmailOutbox:
+    """Background email queue so pages never wait on SMTP.
+
+    ``enqueue`` returns a job id immediately. Worker threads each keep one
+    authenticated connection open while there is mail to send, deliver in
+    batches, retry temporary failures with exponential backoff and drop
+    duplicates of a message that is already queued or sent. Finished jobs
+    (and with them the duplicate check) are forgotten after ``job_ttl``
+    seconds; their bodies as soon as they finish.
+    """
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, username=None, password=None, sender=None, starttls=True,
+                 workers=2, batch_size=20, max_attempts=5, backoff=2.0, idle_timeout=30, timeout=30,
+                 job_ttl=JOB_TTL):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.starttls = starttls
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.job_ttl = job_ttl
+        self.connections_opened = 0
+        self._jobs = {}
+        self._by_key = {}
+        self._finished = deque()  # (monotonic time, job id) in the order jobs finished
+        self._ready = deque()
+        self._delayed = []
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping = False
+
+    # ------------------- PUBLIC API -------------------
+    def enqueue(self, to, subject, body):
+        return self.enqueue_many([(to, subject, body)])[0]
+
+    def enqueue_many(self, messages):
+        """Queue ``(to, subject, body)`` tuples under a single lock; returns their job ids."""
+        job_ids = []
+        with self._cond:
+            self._expire()
+            for to, subject, body in messages:
+                key = hashlib.sha256("\0".join([to, subject, body]).encode()).hexdigest()
+                existing = self._by_key.get(key)
+                if existing is not None and self._jobs[existing]["status"] != "failed":
+                    job_ids.append(existing)
+                    continue
+                job_id = next(self._ids)
+                self._jobs[job_id] = {
+                    "id": job_id, "to": to, "subject": subject, "body": body, "key": key, "status": "queued",
+                    "attempts": 0, "error": None, "updated": time.time(),
+                }
+                self._by_key[key] = job_id
+                job_ids.append(job_id)
+                if not self.sender:
+                    # Nothing could be delivered without a From address; say so rather than retrying
+                    self._finish(job_id, status="failed", error="No sender address: set SMTP_FROM or senderemail")
+                    continue
+                self._ready.append(job_id)
+            self._cond.notify_all()
+            if self._ready and not self._threads:
+                self._start_workers()
+        return job_ids
+
+    def status(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return {k: v for k, v in job.items() if k not in ("body", "key")} if job else None
+
+    def statuses(self, job_ids):
+        return [status for status in map(self.status, job_ids) if status is not None]
+
+    def wait(self, job_ids, timeout=None):
+        """Block until the given jobs are sent or failed; used by scripts, not pages."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(job_id in self._jobs and self._jobs[job_id]["status"] not in ("sent", "failed")
+                      for job_id in job_ids):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    # ------------------- WORKERS -------------------
+    def _start_workers(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"email-outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _set(self, job_id, **changes):
+        job = self._jobs[job_id]
+        job.update(changes, updated=time.time())
+
+    def _finish(self, job_id, **changes):
+        self._set(job_id, **changes)
+        self._jobs[job_id]["body"] = None
+        self._finished.append((time.monotonic(), job_id))
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.job_ttl
+        while self._finished and self._finished[0][0] <= cutoff:
+            job = self._jobs.pop(self._finished.popleft()[1])
+            if self._by_key.get(job["key"]) == job["id"]:
+                del self._by_key[job["key"]]
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._stopping:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[1])
+                if self._ready:
+                    batch = [self._ready.popleft() for _ in range(min(self.batch_size, len(self._ready)))]
+                    for job_id in batch:
+                        self._set(job_id, status="sending")
+                    return batch
+                timeout = self._delayed[0][0] - now if self._delayed else self.idle_timeout
+                if not self._cond.wait(timeout) and not self._delayed:
+                    return []
+            return None
+
+    def _connect(self):
+        with span("smtp.connect"):
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        self.connections_opened += 1
+        return smtp
+
+    def _message(self, job):
+        msg = EmailMessage()
+        msg.set_content(job["body"])
+        msg['Subject'] = job["subject"]
+        msg['From'] = self.sender
+        msg['To'] = job["to"]
+        return msg
+
+    def _work(self):
+        smtp = None
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                # Idle or stopping: give the connection back to the server
+                if smtp is not None:
+                    try:
+                        smtp.quit()
+                    except (smtplib.SMTPException, OSError):
+                        pass
+                    smtp = None
+                if batch is None:
+                    return
+                continue
+
+            for job_id in batch:
+                job = self._jobs[job_id]
+                try:
+                    if smtp is None:
+                        smtp = self._connect()
+                    with span("smtp.send"):
+                        smtp.send_message(self._message(job))
+                except smtplib.SMTPRecipientsRefused as e:
+                    # Only this address is bad: smtplib has already reset the transaction, so the
+                    # connection stays open for the rest of the batch
+                    count("smtp.error")
+                    with self._cond:
+                        self._finish(job_id, status="failed", attempts=job["attempts"] + 1, error=repr(e))
+                        self._cond.notify_all()
+                except Exception as e:
+                    count("smtp.error")
+                    permanent = isinstance(e, smtplib.SMTPAuthenticationError) or (
+                        isinstance(e, smtplib.SMTPResponseException) and e.smtp_code >= 500)
+                    if smtp is not None and not isinstance(e, smtplib.SMTPResponseException):
+                        # Broken connection rather than a rejected message: reconnect next time
+                        smtp.close()
+                        smtp = None
+                    with self._cond:
+                        attempts = job["attempts"] + 1
+                        if permanent or attempts >= self.max_attempts:
+                            self._finish(job_id, status="failed", attempts=attempts, error=repr(e))
+                        else:
+                            self._set(job_id, status="retrying", attempts=attempts, error=repr(e))
+                            ready_at = time.monotonic() + self.backoff * 2 ** (attempts - 1)
+                            heapq.heappush(self._delayed, (ready_at, job_id))
+                        self._cond.notify_all()
+                else:
+                    with self._cond:
+                        self._finish(job_id, status="sent", attempts=job["attempts"] + 1, error=None)
+                        self._cond.notify_all()
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox():
+    """Process-wide outbox configured from the environment (loaded from .env by the pages)."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = EmailOutbox(
+                host=os.getenv("SMTP_HOST", SMTP_HOST),
+                port=int(os.getenv("SMTP_PORT", SMTP_PORT)),
+                username=os.getenv("senderemail"),
+                password=os.getenv("senderpass"),
+                sender=os.getenv("SMTP_FROM"),
+                starttls=os.getenv("SMTP_STARTTLS", "1") != "0",
+                workers=int(os.getenv("SMTP_WORKERS", 2)),
+                job_ttl=float(os.getenv("OUTBOX_JOB_TTL", JOB_TTL)),
+            )
+    return _outbox
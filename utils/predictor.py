@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from utils.telemetry import timed
+
+FEATURES = [
+    'Midterm_Score', 'Assignments_Avg', 'Quizzes_Avg',
+    'Project_Score', 'Attendance', 'Study_Hours_per_Week', 'Sleep_Hours'
+]
+
+COLS_TO_SHOW = [
+    'Student_ID', 'First_Name', 'Gender', 'Department', 'Midterm_Score', 'Assignments_Avg',
+    'Quizzes_Avg', 'Project_Score', 'Attendance',
+    'Study_Hours_per_Week', 'Sleep_Hours', 'Predicted_Final_Score'
+]
+
+
+# ------------------- PREDICTION FUNCTION -------------------
+@timed("model.fit")
+def predict(df, features=FEATURES):
+    # sklearn takes over a second to import; only training pays for it
+    from sklearn.model_selection import train_test_split
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    y = df['Final_Score']
+    X = df[features]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model = LinearRegression()
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    r2 = r2_score(y_test, y_pred)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+
+    test_students = df.loc[y_test.index].copy()
+    test_students['Predicted_Final_Score'] = y_pred
+    test_students = test_students.round(2)
+
+    results_df = pd.DataFrame({
+        'Actual Final Score': y_test,
+        'Predicted Final Score': y_pred
+    })
+
+    return r2, rmse, results_df, test_students, COLS_TO_SHOW, model
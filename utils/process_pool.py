@@ -0,0 +1,49 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.telemetry import enable
+
+
+def _init_worker(initializer, initargs):
+    # Workers keep telemetry off: their spans would never reach this process's registry
+    enable(False)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def worker_pool(max_workers=None, initializer=None, initargs=()):
+    """New pool of worker processes; ``initializer(*initargs)`` runs once in each worker."""
+    # spawn: pools are started next to Streamlit's and the training worker's threads, which must not be forked
+    context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1, mp_context=context,
+                               initializer=_init_worker, initargs=(initializer, initargs))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool(max_workers=None):
+    """Process-wide pool, kept once started so later retrains skip starting workers and importing sklearn.
+
+    ``max_workers`` only applies to the call that starts it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = worker_pool(max_workers)
+    return _pool
+
+
+def discard_pool(pool):
+    """Shut ``pool`` down and, if it is the process-wide one, start a new one on the next call.
+
+    For a pool that raised ``BrokenProcessPool`` because a worker died.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,210 @@
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from utils.aggregates import get_roster_aggregates
+from utils.chat_context import estimate_tokens
+from utils.scoring import RISK_LEVELS
+from utils.telemetry import timed
+
+N_FEATURES = 2 ** 18
+TOKEN_PATTERN = r"(?u)\b\w[\w.]*\b"  # keeps IDs like S1000 and decimals like 81.7 whole
+CONTEXT_HEADER = "Roster data relevant to the question (answer from it; say so if it is not enough):"
+
+
+def _label(column):
+    return column.replace("_", " ").lower()
+
+
+def student_documents(roster):
+    """One line of text per student, keyed by Student_ID."""
+    columns = [c for c in roster.columns if c not in ("Student_ID", "First_Name")]
+    ids = roster["Student_ID"].astype(str)
+    fields = [_label(c) + " " + roster[c].astype(str) for c in columns]
+    text = "Student " + ids + " " + roster["First_Name"].astype(str) + ": " + fields[0].str.cat(fields[1:], sep=", ")
+    if "Predicted_Final_Score" in roster:
+        # A student below one risk level is below every higher one too
+        levels = sorted(RISK_LEVELS)
+        suffixes = np.array([f"; at risk, predicted below {', '.join(map(str, levels[i:]))}" for i in range(len(levels))] + [""])
+        text = text + suffixes[np.searchsorted(levels, roster["Predicted_Final_Score"].to_numpy(), side="right")]
+    return dict(zip(ids, text))
+
+
+def stat_documents(aggregates):
+    """Short text facts from the materialized roster aggregates."""
+    documents = {}
+    score = aggregates.score
+    documents["class"] = (f"Class overview: {score.count} students, average predicted final score "
+                          f"{score.mean:.1f} (std {score.std:.1f}, min {score.min:.1f}, max {score.max:.1f})")
+
+    top = aggregates.top_students(5)
+    documents["top"] = "Top students by predicted final score: " + ", ".join(
+        f"{name} ({key}) {value}" for key, name, value in top.itertuples(index=False))
+
+    edges, counts = aggregates.histogram.edges, aggregates.histogram.counts
+    documents["risk"] = "At-risk students: " + ", ".join(
+        f"{int(counts[edges[1:] <= level].sum())} predicted below {level}" for level in RISK_LEVELS)
+
+    for group, students, mean, std in aggregates.group_summary().itertuples(index=False):
+        documents[f"group:{group}"] = (f"{aggregates.group_column} {group}: {students} students, "
+                                       f"average predicted final score {mean:.1f} (std {std:.1f})")
+
+    summary = aggregates.summary()
+    for column in summary.columns:
+        stats = summary[column]
+        documents[f"column:{column}"] = (f"Class {_label(column)}: average {stats['mean']:.1f}, "
+                                         f"std {stats['std']:.1f}, min {stats['min']:.1f}, "
+                                         f"median {stats['50%']:.1f}, max {stats['max']:.1f} "
+                                         f"over {int(stats['count'])} students")
+    return documents
+
+
+class RetrievalIndex:
+    """TF-IDF search over keyed text documents, updated in place.
+
+    Terms are hashed into a fixed feature space, so there is no vocabulary to
+    refit: ``update`` only vectorizes documents whose text changed, appends
+    them, retires the rows they replace and adjusts the document frequencies
+    by the difference. Retired rows are compacted away once they make up half
+    the matrix, and the idf-weighted matrix is rebuilt lazily on the next search.
+    """
+
+    def __init__(self, n_features=N_FEATURES):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.vectorizer = HashingVectorizer(n_features=n_features, token_pattern=TOKEN_PATTERN,
+                                            alternate_sign=False, norm=None)
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.texts = {}
+        self._counts = sparse.csr_matrix((0, n_features))
+        self._keys = []
+        self._row = {}
+        self._weighted = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _document_freq(self, rows):
+        return np.bincount(rows.indices, minlength=len(self.doc_freq))
+
+    def update(self, documents):
+        """Make the index hold exactly ``documents`` ({key: text}); returns the number of changed keys."""
+        with self._lock:
+            stale = [key for key in self.texts if key not in documents]
+            changed = [key for key, text in documents.items() if self.texts.get(key) != text]
+            if not stale and not changed:
+                return 0
+
+            retired = [self._row.pop(key) for key in stale + changed if key in self._row]
+            self.doc_freq -= self._document_freq(self._counts[retired])
+            for row in retired:
+                self._keys[row] = None
+            for key in stale:
+                del self.texts[key]
+
+            if changed:
+                vectors = self.vectorizer.transform([documents[key] for key in changed])
+                self.doc_freq += self._document_freq(vectors)
+                for key in changed:
+                    self.texts[key] = documents[key]
+                    self._row[key] = len(self._keys)
+                    self._keys.append(key)
+                self._counts = sparse.vstack([self._counts, vectors], format="csr")
+
+            if 2 * len(self._row) < len(self._keys):
+                alive = [row for row, key in enumerate(self._keys) if key is not None]
+                self._counts = self._counts[alive]
+                self._keys = [self._keys[row] for row in alive]
+                self._row = {key: row for row, key in enumerate(self._keys)}
+            self._weighted = None
+            return len(stale) + len(changed)
+
+    def _matrix(self):
+        from sklearn.preprocessing import normalize
+
+        if self._weighted is None:
+            idf = np.log((1 + len(self._row)) / (1 + self.doc_freq)) + 1
+            matrix = normalize(self._counts @ sparse.diags(idf), copy=False)
+            alive = np.fromiter((key is not None for key in self._keys), dtype=bool, count=len(self._keys))
+            self._weighted = (matrix, idf, list(self._keys), alive)
+        return self._weighted
+
+    def search(self, query, k=5):
+        """``[(key, text, score), ...]`` for the ``k`` best matches with a non-zero score."""
+        from sklearn.preprocessing import normalize
+
+        with self._lock:
+            if not self._row:
+                return []
+            matrix, idf, keys, alive = self._matrix()
+        q = self.vectorizer.transform([query])
+        if not q.nnz:
+            return []
+        q = normalize(q @ sparse.diags(idf))
+        scores = (matrix @ q.T).toarray().ravel()
+        scores[~alive] = 0
+        k = min(k, np.count_nonzero(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        # Texts are read under the lock: an update may have retired a match since the matrix was taken
+        with self._lock:
+            hits = [(keys[i], self.texts.get(keys[i]), float(scores[i])) for i in best]
+        return [hit for hit in hits if hit[1] is not None]
+
+
+class RosterIndex:
+    """Student records and roster statistics, searchable for chat context."""
+
+    def __init__(self, students=5, stats=3, budget=600):
+        self.students = RetrievalIndex()
+        self.stats = RetrievalIndex(n_features=2 ** 16)
+        self.k_students = students
+        self.k_stats = stats
+        self.budget = budget
+        self.version = None
+
+    @timed("retrieval.update")
+    def update(self, roster, aggregates, version=None):
+        changed = self.students.update(student_documents(roster))
+        changed += self.stats.update(stat_documents(aggregates))
+        self.version = version
+        return changed
+
+    @timed("retrieval.search")
+    def context(self, question):
+        """System message with the most relevant rows and stats, capped at ``budget`` tokens; None if nothing matches."""
+        hits = [text for _, text, _ in self.stats.search(question, self.k_stats)]
+        hits += [text for _, text, _ in self.students.search(question, self.k_students)]
+        lines, used = [CONTEXT_HEADER], estimate_tokens(CONTEXT_HEADER)
+        for text in hits:
+            line = f"- {text}"
+            if used + estimate_tokens(line) > self.budget:
+                break
+            lines.append(line)
+            used += estimate_tokens(line)
+        if len(lines) == 1:
+            return None
+        return {"role": "system", "content": "\n".join(lines)}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def update_roster_index(bundle):
+    """Training-worker hook: bring the index up to date with a newly served roster."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = RosterIndex()
+        if _index.version != bundle["model_key"]:
+            _index.update(bundle["roster"], get_roster_aggregates(bundle), bundle["model_key"])
+
+
+def get_roster_index(bundle):
+    update_roster_index(bundle)
+    return _index
@@ -0,0 +1,110 @@
+from math import isfinite
+
+import numpy as np
+import pandas as pd
+
+from utils.predictor import FEATURES
+from utils.telemetry import count, timed
+
+THRESHOLDS = {
+    "Midterm_Score": 65,  # <65 suggests weak base
+    "Assignments_Avg": 70,  # <70 suggests missing or poor assignments
+    "Quizzes_Avg": 70,  # <70 is weak quiz performance
+    "Project_Score": 70,  # <70 suggests poor practical work
+    "Study_Hours_per_Week": 10,  # <10 hours/week is insufficient
+    "Sleep_Hours": 6,  # <6 hours may impact focus
+    "Attendance": 75  # <75% attendance is usually poor
+}
+
+RISK_LEVELS = (50, 60, 70)
+
+
+def model_weights(model):
+    """Coefficients and intercept of a fitted linear model as plain floats."""
+    return np.asarray(model.coef_, dtype=np.float64), float(model.intercept_)
+
+
+@timed("score.roster")
+def score_roster(roster, model, risk_levels=RISK_LEVELS, thresholds=THRESHOLDS, features=FEATURES):
+    """Score a whole roster in one pass.
+
+    ``roster`` is a DataFrame with the feature columns or an (n, 7) array in
+    ``features`` order. Returns predictions, a ``Below_<level>`` flag per risk
+    level and a ``Reason_Mask`` whose bit i is set when the i-th entry of
+    ``thresholds`` is not met. A sharded model (see ``utils.sharding``) scores
+    each row with its shard's weights, or its fallback for arrays.
+    """
+    if isinstance(roster, pd.DataFrame):
+        X = roster[features].to_numpy(dtype=np.float64)
+        index = roster.index
+    else:
+        X = np.asarray(roster, dtype=np.float64)
+        index = None
+
+    shard_key = getattr(model, "shard_key", None)
+    if shard_key is not None:
+        keys = roster[shard_key] if index is not None and shard_key in roster else None
+        predicted = model.predict_matrix(X, keys)
+    else:
+        coef, intercept = model_weights(model)
+        predicted = X @ coef + intercept
+
+    scores = {"Predicted_Final_Score": predicted}
+    flags = predicted[:, None] < np.asarray(risk_levels, dtype=np.float64)
+    for i, level in enumerate(risk_levels):
+        scores[f"Below_{level}"] = flags[:, i]
+
+    columns = [features.index(column) for column in thresholds]
+    below = X[:, columns] < np.asarray(list(thresholds.values()), dtype=np.float64)
+    scores["Reason_Mask"] = below.astype(np.uint8) @ (1 << np.arange(len(columns), dtype=np.uint16))
+
+    return pd.DataFrame(scores, index=index)
+
+
+def describe_reasons(row, thresholds=THRESHOLDS):
+    """Human-readable list of the thresholds a single student falls below."""
+    return [
+        f"{column.replace('_', ' ')} is {row[column]}, which is below the threshold of {threshold}"
+        for column, threshold in thresholds.items()
+        if column in row and row[column] < threshold
+    ]
+
+
+class FastScorer:
+    """Scores one student with a plain dot product, skipping pandas and sklearn.
+
+    Built from a fitted linear model; weights and intercept are held as a flat
+    tuple so a call is a handful of float multiplications.
+    """
+
+    __slots__ = ("features", "weights", "intercept")
+
+    def __init__(self, model, features=FEATURES):
+        coef, intercept = model_weights(model)
+        if len(coef) != len(features):
+            raise ValueError(f"Model has {len(coef)} coefficients but {len(features)} features were given")
+        self.features = tuple(features)
+        self.weights = tuple(coef.tolist())
+        self.intercept = intercept
+
+    def __call__(self, student):
+        count("score.single")
+        total = 0.0
+        for name, weight in zip(self.features, self.weights):
+            try:
+                value = float(student[name])
+            except KeyError:
+                raise ValueError(f"Missing feature {name!r}") from None
+            except (TypeError, ValueError):
+                raise ValueError(f"Feature {name!r} must be numeric, got {student[name]!r}") from None
+            if not isfinite(value):
+                raise ValueError(f"Feature {name!r} must be finite, got {value}")
+            total += weight * value
+        return total + self.intercept
+
+
+def make_scorer(model, features=FEATURES):
+    """Single-student scorer for ``model``: a ``FastScorer``, or one per shard for a sharded model."""
+    if hasattr(model, "scorer"):
+        return model.scorer()
+    return FastScorer(model, features)
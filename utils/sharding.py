@@ -0,0 +1,149 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from utils.predictor import FEATURES, predict
+from utils.process_pool import discard_pool, get_worker_pool
+from utils.scoring import FastScorer, model_weights
+from utils.telemetry import timed
+
+SHARD_KEY = "Department"
+TARGET = "Final_Score"
+MIN_SHARD_ROWS = 50  # smaller groups are scored by the global model
+PARALLEL_MIN_ROWS = 250_000  # below this, sending the shards to the workers costs more than fitting them here
+
+
+def fit_shard(value, shard, features=FEATURES):
+    """Fit one shard the same way ``predict()`` fits the global model; runs in a worker process."""
+    r2, rmse, results_df, test_students, cols_to_show, model = predict(shard, features)
+    return value, model, {"rows": len(shard), "r2": r2, "rmse": rmse}
+
+
+class ShardedModel:
+    """One linear model per value of ``shard_key``, falling back to ``fallback`` for every other row.
+
+    Rows whose key has no shard (unseen, missing, or too few students to
+    train on) are scored by the fallback, normally the global model.
+    """
+
+    def __init__(self, shard_key, fallback, shards=None, metrics=None, features=FEATURES):
+        self.shard_key = shard_key
+        self.fallback = fallback
+        self.shards = dict(shards or {})
+        self.metrics = dict(metrics or {})
+        self.features = list(features)
+        self.values = list(self.shards)
+        # Row i of the stacked weights is shard i; the last row is the fallback
+        weights = [model_weights(model) for model in [*self.shards.values(), fallback]]
+        self._coef = np.array([coef for coef, intercept in weights])
+        self._intercept = np.array([intercept for coef, intercept in weights])
+
+    def route(self, value):
+        return self.shards.get(value, self.fallback)
+
+    def shard_index(self, keys):
+        """Position of each row's shard in ``values``, or ``len(values)`` for the fallback."""
+        values = pd.Index(self.values)
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            # Look up the few categories instead of every row
+            lookup = np.append(values.get_indexer(keys.cat.categories), -1)
+            index = lookup[keys.cat.codes.to_numpy()]
+        else:
+            index = values.get_indexer(keys)
+        index[index < 0] = len(self.values)
+        return index
+
+    def predict_matrix(self, X, keys=None):
+        """Predictions for an (n, d) array; rows are grouped by shard and each group is scored with one product."""
+        X = np.asarray(X, dtype=np.float64)
+        if keys is None:
+            return X @ self._coef[-1] + self._intercept[-1]
+        # Small integers, so the stable sort is a radix sort: grouping costs about one pass over the rows
+        index = self.shard_index(keys).astype(np.min_scalar_type(len(self.values)))
+        order = np.argsort(index, kind="stable")
+        bounds = np.searchsorted(index[order], np.arange(len(self.values) + 2))
+        predicted = np.empty(len(X))
+        for i in range(len(self.values) + 1):
+            rows = order[bounds[i]:bounds[i + 1]]
+            if len(rows):
+                predicted[rows] = X[rows] @ self._coef[i] + self._intercept[i]
+        return predicted
+
+    def predict(self, roster):
+        keys = roster[self.shard_key] if self.shard_key in roster else None
+        return self.predict_matrix(roster[self.features].to_numpy(dtype=np.float64), keys)
+
+    def scorer(self):
+        return ShardedScorer(self)
+
+    def summary(self):
+        """One row per key value: students, whether it has its own model, and that model's test R² and RMSE."""
+        return pd.DataFrame([
+            {self.shard_key: value, "Students": metrics["rows"],
+             "Model": "own" if value in self.shards else "global (too few students)",
+             "R²": metrics.get("r2", np.nan), "RMSE": metrics.get("rmse", np.nan)}
+            for value, metrics in self.metrics.items()
+        ])
+
+
+class ShardedScorer:
+    """``FastScorer`` per shard; a student is scored by the one for their ``shard_key`` value."""
+
+    __slots__ = ("shard_key", "scorers", "fallback")
+
+    def __init__(self, model):
+        self.shard_key = model.shard_key
+        self.scorers = {value: FastScorer(shard, model.features) for value, shard in model.shards.items()}
+        self.fallback = FastScorer(model.fallback, model.features)
+
+    def __call__(self, student):
+        return self.scorers.get(student.get(self.shard_key), self.fallback)(student)
+
+
+@timed("model.fit_shards")
+def train_shards(df, shard_key=SHARD_KEY, fallback=None, features=FEATURES, min_rows=MIN_SHARD_ROWS,
+                 workers=None):
+    """Fit one model per ``shard_key`` value, in parallel worker processes for large rosters.
+
+    ``fallback`` defaults to a model fitted on the whole roster.
+    """
+    if fallback is None:
+        fallback = predict(df, features)[-1]
+    groups = df[features + [TARGET, shard_key]].groupby(shard_key, observed=True, sort=True)
+    metrics = {value: {"rows": len(group)} for value, group in groups}
+    # Largest first, so a big shard never starts last and holds up the pool
+    eligible = sorted(((value, group.drop(columns=shard_key)) for value, group in groups if len(group) >= min_rows),
+                      key=lambda item: -len(item[1]))
+
+    workers = min(workers or os.cpu_count() or 1, len(eligible))
+    values = [value for value, shard in eligible]
+    shards = [shard for value, shard in eligible]
+    if workers > 1 and len(df) >= PARALLEL_MIN_ROWS:
+        pool = get_worker_pool(workers)
+        try:
+            results = list(pool.map(fit_shard, values, shards, [features] * len(values)))
+        except BrokenProcessPool:
+            discard_pool(pool)
+            raise
+    else:
+        results = [fit_shard(value, shard, features) for value, shard in eligible]
+
+    models = {}
+    for value, model, shard_metrics in results:
+        models[value] = model
+        metrics[value] = shard_metrics
+    return ShardedModel(shard_key, fallback, dict(sorted(models.items())), metrics, features)
+
+
+def rescore_result(result, router):
+    """``predict()`` result with the test split's predictions made by ``router``.
+
+    R², RMSE and ``results_df`` stay those of the global model on its own
+    split. ``test_students`` is copied, since the cached result is shared.
+    """
+    r2, rmse, results_df, test_students, cols_to_show, model = result
+    test_students = test_students.copy()
+    test_students["Predicted_Final_Score"] = router.predict(test_students).round(2)
+    return r2, rmse, results_df, test_students, cols_to_show, model
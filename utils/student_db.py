@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from utils.predictor import COLS_TO_SHOW
+from utils.telemetry import span, timed
+
+DB_PATH = os.path.join("data", "students.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    Student_ID TEXT PRIMARY KEY,
+    First_Name TEXT,
+    Gender TEXT,
+    Department TEXT,
+    Midterm_Score NUMERIC,
+    Assignments_Avg NUMERIC,
+    Quizzes_Avg NUMERIC,
+    Project_Score NUMERIC,
+    Attendance NUMERIC,
+    Study_Hours_per_Week NUMERIC,
+    Sleep_Hours NUMERIC,
+    Predicted_Final_Score NUMERIC
+);
+CREATE INDEX IF NOT EXISTS idx_students_department ON students (Department);
+CREATE INDEX IF NOT EXISTS idx_students_predicted ON students (Predicted_Final_Score);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class StudentStore:
+    """SQLite-backed roster so lookups, top-k and threshold queries run in the database.
+
+    Each thread (one per Streamlit session) gets its own connection; WAL mode
+    lets sessions keep reading while the training worker replaces the roster.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+        return conn
+
+    def _query(self, sql, params=()):
+        with span("db.query"):
+            return pd.read_sql_query(sql, self._connect(), params=params)
+
+    def fingerprint(self):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        return row[0] if row else None
+
+    @timed("db.replace_roster")
+    def replace_roster(self, roster, fingerprint=None):
+        """Swap in a new scored roster in one transaction."""
+        if fingerprint is not None and fingerprint == self.fingerprint():
+            return
+        columns = [column for column in COLS_TO_SHOW if column in roster]
+        # Series.tolist() hands sqlite plain Python values instead of numpy scalars
+        rows = list(zip(*(roster[column].tolist() for column in columns)))
+        placeholders = ", ".join("?" * len(columns))
+        with self._connect() as conn:
+            conn.execute("DELETE FROM students")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO students ({', '.join(columns)}) VALUES ({placeholders})", rows)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+
+    def student_ids(self):
+        with span("db.query"):
+            return [row[0] for row in self._connect().execute("SELECT Student_ID FROM students ORDER BY Student_ID")]
+
+    def get_student(self, student_id):
+        df = self._query("SELECT * FROM students WHERE Student_ID = ?", (student_id,))
+        return df.iloc[0] if len(df) else None
+
+    def top_k(self, k, columns=("Student_ID", "First_Name", "Predicted_Final_Score")):
+        return self._query(
+            f"SELECT {', '.join(columns)} FROM students ORDER BY Predicted_Final_Score DESC LIMIT ?", (k,))
+
+    def below_threshold(self, threshold, columns=("First_Name", "Student_ID", "Predicted_Final_Score")):
+        return self._query(
+            f"SELECT {', '.join(columns)} FROM students WHERE Predicted_Final_Score < ? "
+            f"ORDER BY Predicted_Final_Score", (threshold,))
+
+    def by_department(self, department):
+        return self._query("SELECT * FROM students WHERE Department = ?", (department,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_student_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = StudentStore()
+    return _store
+
+
+def sync_bundle(bundle):
+    """Training-worker hook: mirror the scored roster of a newly served model."""
+    get_student_store().replace_roster(bundle["roster"], bundle["model_key"])
@@ -0,0 +1,306 @@
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from functools import wraps
+
+ENABLED = os.getenv("PERF_TELEMETRY", "0") == "1"
+METRICS_PATH = os.path.join("data", "metrics.prom")
+EXPORT_INTERVAL = 15
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BACKGROUND = "background"  # page label for work outside a script run: training, outbox, exporter
+RECENT_RERUNS = 200
+
+_NOOP = nullcontext()
+_local = threading.local()
+
+
+class _Stat:
+    """Count, sum, max and cumulative-bucket histogram of observed durations."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+
+class Rerun:
+    """One script run of a page and the spans recorded on its thread."""
+
+    __slots__ = ("page", "started_at", "started", "last", "ended", "spans")
+
+    def __init__(self, page):
+        self.page = page
+        self.started_at = time.time()
+        self.started = self.last = time.perf_counter()
+        self.ended = None
+        self.spans = defaultdict(float)
+
+    @property
+    def complete(self):
+        return self.ended is not None
+
+    @property
+    def seconds(self):
+        # Runs cut short by st.stop()/st.rerun() are timed up to their last recorded span
+        return (self.ended or self.last) - self.started
+
+
+class Span:
+    __slots__ = ("telemetry", "name", "started")
+
+    def __init__(self, telemetry, name):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Telemetry:
+    """Process-wide timings and counters, keyed by page and span name.
+
+    Spans recorded on a Streamlit script thread are attributed to the page
+    that thread is running (see ``page``) and to that rerun; anything else is
+    attributed to ``BACKGROUND``.
+    """
+
+    def __init__(self, path=METRICS_PATH, interval=EXPORT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.started_at = time.time()
+        self._spans = defaultdict(_Stat)
+        self._reruns = defaultdict(_Stat)
+        self._counters = defaultdict(int)
+        self._recent = deque(maxlen=RECENT_RERUNS)
+        self._lock = threading.Lock()
+        self._exporter = None
+
+    # ---- RECORDING ----
+    def page(self, name):
+        rerun = Rerun(name)
+        _local.rerun = rerun
+        with self._lock:
+            self._counters[(name, "reruns")] += 1
+            self._recent.append(rerun)
+        return rerun
+
+    def finish(self):
+        rerun = getattr(_local, "rerun", None)
+        if rerun is None or rerun.complete:
+            return
+        rerun.ended = time.perf_counter()
+        with self._lock:
+            self._reruns[rerun.page].observe(rerun.seconds)
+
+    def observe(self, name, seconds):
+        rerun = getattr(_local, "rerun", None)
+        page = rerun.page if rerun is not None else BACKGROUND
+        with self._lock:
+            self._spans[(page, name)].observe(seconds)
+            if rerun is not None:
+                rerun.spans[name] += seconds
+                rerun.last = time.perf_counter()
+
+    def count(self, name, n=1):
+        rerun = getattr(_local, "rerun", None)
+        page = rerun.page if rerun is not None else BACKGROUND
+        with self._lock:
+            self._counters[(page, name)] += n
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._reruns.clear()
+            self._counters.clear()
+            self._recent.clear()
+            self.started_at = time.time()
+
+    # ---- READING ----
+    def snapshot(self):
+        """Plain-data copy of everything recorded so far, for the performance page."""
+        with self._lock:
+            spans = [
+                {"page": page, "span": name, "calls": stat.count, "total_ms": stat.total * 1000,
+                 "mean_ms": stat.total / stat.count * 1000, "max_ms": stat.max * 1000}
+                for (page, name), stat in self._spans.items()
+            ]
+            reruns = [
+                {"page": page, "reruns": stat.count, "mean_ms": stat.total / stat.count * 1000,
+                 "max_ms": stat.max * 1000}
+                for page, stat in self._reruns.items()
+            ]
+            counters = [{"page": page, "counter": name, "value": value}
+                        for (page, name), value in self._counters.items()]
+            recent = [
+                {"page": rerun.page, "started_at": rerun.started_at, "ms": rerun.seconds * 1000,
+                 "complete": rerun.complete, "spans": {name: s * 1000 for name, s in rerun.spans.items()}}
+                for rerun in self._recent
+            ]
+        return {"since": self.started_at, "spans": spans, "reruns": reruns, "counters": counters, "recent": recent}
+
+    def prometheus(self, prefix="student_app"):
+        """Everything recorded so far in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for metric, help_text, stats, label in (
+                    ("span_seconds", "Time spent in instrumented code paths.", self._spans, ("page", "span")),
+                    ("rerun_seconds", "Script run time of each page, for runs that finished.", self._reruns,
+                     ("page",))):
+                name = f"{prefix}_{metric}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for key, stat in sorted(stats.items()):
+                    labels = _labels(zip(label, key if isinstance(key, tuple) else (key,)))
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS + (float("inf"),), stat.buckets):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{labels}}} {stat.total!r}")
+                    lines.append(f"{name}_count{{{labels}}} {stat.count}")
+
+            name = f"{prefix}_events_total"
+            lines += [f"# HELP {name} Counted events: reruns, cache hits and misses, retries and failures.",
+                      f"# TYPE {name} counter"]
+            for (page, event), value in sorted(self._counters.items()):
+                lines.append(f"{name}{{{_labels([('page', page), ('event', event)])}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    # ---- EXPORT ----
+    def write(self, path=None):
+        path = path or self.path
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.prometheus())
+            # Scrapers (e.g. node_exporter's textfile collector) never see a half-written file
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path
+
+    def start_exporter(self):
+        with self._lock:
+            if self._exporter is None:
+                self._exporter = threading.Thread(target=self._export, name="telemetry-exporter", daemon=True)
+                self._exporter.start()
+        return self
+
+    def _export(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                pass
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in pairs)
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry():
+    """Process-wide registry; writes PERF_METRICS_PATH every PERF_EXPORT_INTERVAL seconds while enabled."""
+    global _telemetry
+    if _telemetry is not None:
+        return _telemetry  # every span goes through here; skip the lock once it exists
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry(
+                path=os.getenv("PERF_METRICS_PATH", METRICS_PATH),
+                interval=float(os.getenv("PERF_EXPORT_INTERVAL", EXPORT_INTERVAL)),
+            )
+            if ENABLED:
+                _telemetry.start_exporter()
+    return _telemetry
+
+
+# ------------------- INSTRUMENTATION API -------------------
+# With PERF_TELEMETRY unset each call is a single flag check, so call sites stay in place for good
+def is_enabled():
+    return ENABLED
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+    if flag:
+        get_telemetry().start_exporter()
+
+
+def start_rerun(page):
+    """Start timing a script run; call at the top of each page."""
+    if ENABLED:
+        get_telemetry().page(page)
+
+
+def finish_rerun():
+    """Mark the current script run as complete; call at the end of each page and before st.stop()."""
+    if ENABLED:
+        get_telemetry().finish()
+
+
+def span(name):
+    """``with span("chart.box"):`` times the block."""
+    if not ENABLED:
+        return _NOOP
+    return Span(get_telemetry(), name)
+
+
+def timed(name):
+    """Decorator form of ``span``."""
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return function(*args, **kwargs)
+            with Span(get_telemetry(), name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def observe(name, seconds):
+    """Record a duration measured elsewhere, e.g. a streamed reply's time to first token."""
+    if ENABLED:
+        get_telemetry().observe(name, seconds)
+
+
+def count(name, n=1):
+    if ENABLED:
+        get_telemetry().count(name, n)
+
+
+def is_admin(email):
+    """Whether ``email`` may open the performance page (listed in PERF_ADMINS, comma-separated)."""
+    admins = {address.strip().lower() for address in os.getenv("PERF_ADMINS", "").split(",") if address.strip()}
+    return bool(email) and email.strip().lower() in admins
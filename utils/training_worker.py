@@ -0,0 +1,216 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from utils.aggregates import build_aggregates
+from utils.dataset_store import load_frame
+from utils.incremental_model import batch_stats
+from utils.model_cache import MODEL_CACHE, dataset_fingerprint
+from utils.predictor import FEATURES
+from utils.roster_index import update_roster_index
+from utils.sharding import MIN_SHARD_ROWS, rescore_result, train_shards
+from utils.student_db import sync_bundle
+from utils.telemetry import span
+
+DATASET_PATH = "Student Performance Sample.csv"
+ARTIFACT_DIR = "models"
+LATEST_POINTER = "LATEST"
+
+
+def model_config(shard_key=None, features=FEATURES):
+    """Short hash of the settings a bundle is trained with; a bundle trained with others is refitted."""
+    config = {"features": list(features), "shard_key": shard_key,
+              "min_shard_rows": MIN_SHARD_ROWS if shard_key else None}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class TrainingWorker:
+    """Refits the model in a background thread and hot-swaps the serving bundle.
+
+    Each fit is written to ``artifact_dir`` as a versioned joblib file, so a
+    restart serves the last artifact instead of retraining from the CSV. The
+    dataset itself is not stored in the artifact; it is re-attached from the
+    memory-mapped store, and the served roster (``bundle["roster"]``) is
+    projected from the test split once per swap, next to the global model's
+    training statistics (``bundle["train_stats"]``). ``on_swap`` callbacks run with each new bundle before
+    it becomes visible to sessions. With ``shard_key`` set, each fit also
+    trains one model per value of that column, served as ``bundle["router"]``.
+    """
+
+    def __init__(self, dataset_path=DATASET_PATH, artifact_dir=ARTIFACT_DIR, interval=30, keep=5, on_swap=(),
+                 shard_key=None, shard_workers=None):
+        self.dataset_path = dataset_path
+        self.artifact_dir = artifact_dir
+        self.interval = interval
+        self.keep = keep
+        self.on_swap = list(on_swap)
+        self.shard_key = shard_key
+        self.shard_workers = shard_workers
+        self.config = model_config(shard_key)
+        self.last_error = None
+        self._current = None
+        self._dataset_stat = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="training-worker", daemon=True)
+                self._thread.start()
+        return self
+
+    def current(self, timeout=120):
+        # Only blocks until the latest artifact is loaded, or trained on a cold start
+        if not self._ready.wait(timeout):
+            raise RuntimeError(f"No trained model available yet: {self.last_error}")
+        return self._current
+
+    def trigger(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        # Loading happens on this thread too, so starting the worker never blocks a page
+        self._load_latest()
+        while not self._stop.is_set():
+            try:
+                self._refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = repr(e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _refresh(self):
+        stat = os.stat(self.dataset_path)
+        dataset_stat = (stat.st_mtime_ns, stat.st_size)
+        # A served bundle trained with other settings (e.g. before MODEL_SHARD_KEY was set) is refitted
+        configured = self._current is not None and self._current.get("config") == self.config
+        if configured and dataset_stat == self._dataset_stat:
+            return
+
+        df = load_frame(self.dataset_path)
+        fingerprint = dataset_fingerprint(df)
+        if configured and self._current["fingerprint"] == fingerprint:
+            # Touched but not changed; a changed file is only marked seen by _swap, so a failed fit is retried
+            self._dataset_stat = dataset_stat
+            return
+
+        bundle = {
+            "version": self._current["version"] + 1 if self._current else 1,
+            "fingerprint": fingerprint,
+            "config": self.config,
+            "trained_at": datetime.now().isoformat(timespec="seconds"),
+            "dataset_stat": dataset_stat,
+            "dataset": df,
+            "result": MODEL_CACHE.get_or_fit(df),
+        }
+        if self.shard_key:
+            bundle["router"] = train_shards(df, self.shard_key, fallback=bundle["result"][-1],
+                                            workers=self.shard_workers)
+            # Before the hooks, so the student store, aggregates and index show the scores sessions get
+            bundle["result"] = rescore_result(bundle["result"], bundle["router"])
+        self._write(bundle)
+        self._swap(bundle)
+
+    def _swap(self, bundle):
+        # Identifies the served scores: the student store, index and aggregates resync when either part changes
+        bundle["model_key"] = f"{bundle['fingerprint']}:{bundle.get('config', '')}"
+        # Projected once here; sessions and hooks share this frame rather than each building a copy
+        r2, rmse, results_df, test_students, cols_to_show, model = bundle["result"]
+        bundle["roster"] = test_students[cols_to_show]
+        # Statistics of the rows the global model was fitted on, so uploaded marksheets extend that same fit
+        train = np.ones(len(bundle["dataset"]), dtype=bool)
+        train[bundle["dataset"].index.get_indexer(test_students.index)] = False
+        bundle["train_stats"] = batch_stats(bundle["dataset"][FEATURES].to_numpy(dtype=np.float64)[train],
+                                            bundle["dataset"]["Final_Score"].to_numpy(dtype=np.float64)[train])
+        for callback in self.on_swap:
+            try:
+                with span(f"swap.{callback.__name__}"):
+                    callback(bundle)
+            except Exception as e:
+                self.last_error = repr(e)
+        # Sessions only ever see a fully built bundle
+        self._current = bundle
+        self._dataset_stat = bundle["dataset_stat"]
+        self._ready.set()
+
+    def _atomic_write(self, path, write):
+        fd, tmp = tempfile.mkstemp(dir=self.artifact_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _write(self, bundle):
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        name = f"model-v{bundle['version']:05d}-{bundle['fingerprint'][:12]}-{bundle['config'][:8]}.joblib"
+        artifact = {key: value for key, value in bundle.items() if key not in ("dataset", "roster", "train_stats", "model_key")}
+        self._atomic_write(os.path.join(self.artifact_dir, name), lambda f: joblib.dump(artifact, f))
+        self._atomic_write(os.path.join(self.artifact_dir, LATEST_POINTER), lambda f: f.write(name.encode()))
+
+        artifacts = sorted(glob.glob(os.path.join(self.artifact_dir, "model-v*.joblib")))
+        for old in artifacts[:-self.keep]:
+            os.unlink(old)
+
+    def _load_latest(self):
+        pointer = os.path.join(self.artifact_dir, LATEST_POINTER)
+        candidates = sorted(glob.glob(os.path.join(self.artifact_dir, "model-v*.joblib")), reverse=True)
+        if os.path.exists(pointer):
+            with open(pointer) as f:
+                candidates.insert(0, os.path.join(self.artifact_dir, f.read().strip()))
+        # The newest artifact trained with the current settings; failing that, the newest at all, served
+        # until _refresh has refitted it
+        bundle = fallback = None
+        for path in candidates:
+            try:
+                artifact = joblib.load(path)
+            except Exception as e:
+                self.last_error = repr(e)
+                continue
+            if artifact.get("config") == self.config:
+                bundle = artifact
+                break
+            fallback = fallback or artifact
+        bundle = bundle or fallback
+        if bundle is None:
+            return
+        try:
+            bundle["dataset"] = load_frame(self.dataset_path)
+            self._swap(bundle)
+        except Exception as e:
+            self.last_error = repr(e)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_training_worker():
+    """Process-wide worker, started on first use; MODEL_SHARD_KEY (e.g. Department) turns on per-group models."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TrainingWorker(
+                on_swap=[sync_bundle, build_aggregates, update_roster_index],
+                shard_key=os.getenv("MODEL_SHARD_KEY") or None,
+                shard_workers=int(os.getenv("MODEL_SHARD_WORKERS", 0)) or None,
+            )
+    return _worker.start()